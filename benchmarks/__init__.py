@@ -0,0 +1,12 @@
+"""
+Synthetic load benchmarks for the message -> match -> alert path.
+
+Run from the repository root so the bot's configuration resolves:
+
+    python -m benchmarks.run --filters 10 1000 100000 --messages 5000 --output results.json
+    python -m benchmarks.run --filters 10 1000 100000 --messages 5000 --baseline results.json
+
+Compare where matching runs with --match-executor inline|thread|process. The default,
+inline, matches on the event loop; with thread or process, every filter count is
+offloaded unless --offload-threshold is raised above its default of 0.
+"""
@@ -0,0 +1,155 @@
+# System imports
+import random
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+# Third-party imports
+import discord
+
+# Syllables used to build filter terms and filler words
+SYLLABLES = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'to', 'vi', 'ze', 'po', 'qua', 'ber', 'dun', 'fix', 'gor']
+
+@dataclass
+class FakeAvatar:
+    url: str = 'https://cdn.discordapp.com/embed/avatars/0.png'
+
+@dataclass
+class FakeUser:
+    id: int
+    name: str = 'benchmark'
+    display_name: str = 'benchmark'
+    bot: bool = False
+    discriminator: str = '0'
+    avatar: Optional[FakeAvatar] = field(default_factory=FakeAvatar)
+
+    @property
+    def display_avatar(self) -> FakeAvatar:
+        return self.avatar or FakeAvatar()
+
+@dataclass
+class FakeChannel:
+    id: int
+    name: str = 'listings'
+
+@dataclass
+class FakeGuild:
+    id: int
+    name: str = 'benchmark'
+
+@dataclass
+class FakeMessage:
+    """
+    Stand-in for `discord.Message` with just the attributes the MoneyPenny cog reads.
+    """
+    id: int
+    author: FakeUser
+    channel: FakeChannel
+    guild: Optional[FakeGuild]
+    embeds: List[discord.Embed]
+    webhook_id: Optional[int] = None
+    content: str = ''
+
+    @property
+    def jump_url(self) -> str:
+        guild_id = self.guild.id if self.guild else '@me'
+        return f"https://discord.com/channels/{guild_id}/{self.channel.id}/{self.id}"
+
+@dataclass
+class FakeBot:
+    """
+    Stand-in for the `commands.Bot` the cog is constructed with.
+    """
+    user: FakeUser = field(default_factory=lambda: FakeUser(id=1))
+    session: object = None
+
+class WorkloadGenerator:
+    """
+    Builds reproducible filter lists and Moneypenny messages. The same seed and
+    parameters always produce the same workload, so runs can be compared.
+    """
+
+    def __init__(self, seed: int = 0) -> None:
+        self.random = random.Random(seed)
+
+    def word(self, syllables: int) -> str:
+        return ''.join(self.random.choice(SYLLABLES) for _ in range(syllables))
+
+    def filters(self, count: int) -> List[str]:
+        """
+        Generates unique upper-case filter terms.
+
+        :param count: The number of filters.
+        :return: The filter terms.
+        """
+        terms = set()
+        while len(terms) < count:
+            terms.add(self.word(self.random.randint(3, 5)).upper())
+        return sorted(terms)
+
+    def title(self, length: int, term: Optional[str] = None) -> str:
+        """
+        Generates a title of roughly `length` characters, optionally containing a filter term.
+
+        :param length: The target title length.
+        :param term: A filter term to embed in the title.
+        :return: The title.
+        """
+        words: List[str] = []
+        while sum(len(word) + 1 for word in words) < length:
+            # Short filler words rarely collide with the longer filter terms
+            words.append(self.word(1).capitalize())
+
+        if term:
+            words.insert(self.random.randrange(len(words) + 1), term.title())
+        return ' '.join(words)
+
+    def embed(self, title_length: int, field_count: int, term: Optional[str] = None) -> discord.Embed:
+        """
+        Builds a Moneypenny listing embed.
+
+        :param title_length: The target title length.
+        :param field_count: The number of fields, the first of which is the address.
+        :param term: A filter term to embed in the title.
+        :return: The embed.
+        """
+        embed = discord.Embed(title=self.title(title_length, term), description=self.title(title_length))
+        embed.set_author(name='Moneypenny')
+
+        for index in range(field_count):
+            name = 'Address' if index == 0 else f"Field {index}"
+            embed.add_field(name=name, value=self.title(24), inline=False)
+        return embed
+
+    def messages(
+        self,
+        count: int,
+        filters: List[str],
+        hit_ratio: float,
+        title_length: int,
+        field_count: int
+    ) -> List[FakeMessage]:
+        """
+        Generates webhook messages carrying a single Moneypenny embed each.
+
+        :param count: The number of messages.
+        :param filters: The filters that matching messages draw their terms from.
+        :param hit_ratio: The fraction of messages whose title contains a filter.
+        :param title_length: The target title length.
+        :param field_count: The number of embed fields.
+        :return: The messages.
+        """
+        webhook = FakeUser(id=2, name='Moneypenny', bot=True, discriminator='0000')
+        channel, guild = FakeChannel(id=10), FakeGuild(id=20)
+
+        messages = []
+        for index in range(count):
+            term = self.random.choice(filters) if filters and self.random.random() < hit_ratio else None
+            messages.append(FakeMessage(
+                id=1000 + index,
+                author=webhook,
+                channel=channel,
+                guild=guild,
+                embeds=[self.embed(title_length, field_count, term)],
+                webhook_id=webhook.id
+            ))
+        return messages
@@ -0,0 +1,300 @@
+# System imports
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+# Project-specific imports
+from benchmarks.fakes import FakeBot, WorkloadGenerator
+from src.configuration.config import config
+from src.cogs.data.backends import JsonFilterBackend
+from src.cogs.data.filter_store import FilterStore
+from src.cogs.data.load_filters import save_filters
+from src.cogs.data.match_pool import MATCH_MODES, MatchPool
+from src.cogs.moneypenny import MoneyPenny
+from src.utilities.cache import TTLCache
+from src.utilities.ingest import OVERFLOW_POLICIES, IngestQueue
+from src.utilities.routing import AlertRouter
+
+DEFAULT_FILTER_COUNTS = [10, 100, 1000, 10000, 100000]
+
+# Metrics compared against a baseline, and whether a higher value is better
+COMPARED_METRICS = {
+    'p50_ms': False,
+    'p99_ms': False,
+    'messages_per_second': True,
+    'peak_rss_mb': False
+}
+
+class StubDispatcher:
+    """
+    Drop-in for `WebhookDispatcher` that only counts the payloads it is given.
+    """
+
+    def __init__(self) -> None:
+        self.payloads = 0
+
+    def enqueue(self, payload: Dict[str, Any]) -> bool:
+        self.payloads += 1
+        return True
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """
+    :param sorted_values: Values in ascending order.
+    :param fraction: The percentile as a fraction between 0 and 1.
+    :return: The nearest-rank percentile of the values.
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def peak_rss_mb() -> float:
+    """
+    :return: The peak resident set size of this process in megabytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+async def start_webhook_server() -> Any:
+    """
+    Starts a local aiohttp server that accepts webhook posts like Discord does.
+
+    :return: The runner, its webhook URL and a dict counting received requests.
+    """
+    from aiohttp import web
+
+    received = {'requests': 0, 'embeds': 0}
+
+    async def handle(request: web.Request) -> web.Response:
+        payload = await request.json()
+        received['requests'] += 1
+        received['embeds'] += len(payload.get('embeds', []))
+        return web.Response(status=204)
+
+    app = web.Application()
+    app.router.add_post('/webhook', handle)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/webhook", received
+
+async def run_once(filter_count: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Drives the MoneyPenny cog with a generated workload for one filter count.
+
+    :param filter_count: The number of filters to load.
+    :param args: The parsed command line arguments.
+    :return: The measured results.
+    """
+    generator = WorkloadGenerator(args.seed)
+    filters = generator.filters(filter_count)
+    messages = generator.messages(args.messages, filters, args.hit_ratio, args.title_length, args.fields)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'filters.json')
+        save_filters(filters, path)
+
+        cog = MoneyPenny(FakeBot())
+        cog.filters = FilterStore(JsonFilterBackend(path))
+        if not args.dedup:
+            cog.seen_alerts = TTLCache(maxsize=0)
+        cog.match_pool = MatchPool(args.match_executor, threshold=args.offload_threshold)
+        cog.ingest = IngestQueue(
+            cog._handle_candidate,
+            max_queue=args.ingest_queue_size,
+            workers=args.ingest_workers,
+            overflow=args.ingest_overflow,
+            triage=cog._triage
+        )
+
+        # Compiling the matcher is a one-off cost, reported separately from per-message latency
+        compile_started = time.perf_counter()
+        cog.filters.matcher
+        compile_seconds = time.perf_counter() - compile_started
+
+        runner = received = None
+        if args.webhook_server:
+            import aiohttp
+
+            runner, url, received = await start_webhook_server()
+            cog.router.configure(url, [])
+            session = aiohttp.ClientSession()
+            await cog.router.start(session)
+        else:
+            cog.router = AlertRouter(config['webhook_url'], lambda url: StubDispatcher())
+
+        # With ingest workers, latency is the time on_message takes to hand an embed over
+        cog.ingest.start()
+
+        latencies: List[float] = []
+        started = time.perf_counter()
+        for message in messages:
+            message_started = time.perf_counter()
+            await cog.on_message(message)
+            latencies.append(time.perf_counter() - message_started)
+        await cog.ingest.close(timeout=600)
+        elapsed = time.perf_counter() - started
+        cog.match_pool.close()
+
+        if args.webhook_server:
+            await cog.router.close(timeout=60)
+            drained = time.perf_counter() - started
+            await session.close()
+            await runner.cleanup()
+
+    latencies.sort()
+    result = {
+        'filters': filter_count,
+        'messages': len(messages),
+        'compile_ms': compile_seconds * 1000,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'messages_per_second': len(messages) / elapsed if elapsed else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+        'stages': dict(cog.stage_counts),
+        'ingest_dropped': dict(cog.ingest.dropped)
+    }
+    if args.webhook_server:
+        result['webhook'] = dict(received, drain_seconds=drained)
+    return result
+
+def run_isolated(filter_count: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Runs a single filter count in a fresh interpreter, so peak RSS and warm caches
+    from one configuration don't leak into the next.
+
+    :param filter_count: The number of filters to load.
+    :param args: The parsed command line arguments.
+    :return: The results printed by the child process.
+    """
+    command = [
+        sys.executable, '-m', 'benchmarks.run',
+        '--single', str(filter_count),
+        '--messages', str(args.messages),
+        '--title-length', str(args.title_length),
+        '--fields', str(args.fields),
+        '--hit-ratio', str(args.hit_ratio),
+        '--seed', str(args.seed),
+        '--match-executor', args.match_executor,
+        '--offload-threshold', str(args.offload_threshold),
+        '--ingest-workers', str(args.ingest_workers),
+        '--ingest-queue-size', str(args.ingest_queue_size),
+        '--ingest-overflow', args.ingest_overflow
+    ]
+    if args.dedup:
+        command.append('--dedup')
+    if args.webhook_server:
+        command.append('--webhook-server')
+
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any]) -> None:
+    """
+    Prints the relative change of each metric against a previous run.
+
+    :param results: The results of this run.
+    :param baseline: A previous run's output file contents.
+    """
+    previous = {entry['filters']: entry for entry in baseline.get('results', [])}
+
+    print("\nChange vs baseline (+ is better):")
+    for result in results:
+        before = previous.get(result['filters'])
+        if not before:
+            continue
+
+        changes = []
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            if not before.get(metric):
+                continue
+            change = (result[metric] - before[metric]) / before[metric] * 100
+            changes.append(f"{metric} {change if higher_is_better else -change:+.1f}%")
+        print(f"  {result['filters']:>7} filters: " + ', '.join(changes))
+
+def print_row(result: Dict[str, Any]) -> None:
+    print(
+        f"{result['filters']:>8} {result['compile_ms']:>11.1f} {result['p50_ms']:>9.3f} "
+        f"{result['p99_ms']:>9.3f} {result['messages_per_second']:>10.0f} {result['peak_rss_mb']:>8.1f}"
+    )
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the MoneyPenny message -> match -> alert path.")
+    parser.add_argument('--filters', type=int, nargs='+', default=DEFAULT_FILTER_COUNTS, help="Filter counts to benchmark.")
+    parser.add_argument('--messages', type=int, default=5000, help="Messages per filter count.")
+    parser.add_argument('--title-length', type=int, default=80, help="Approximate embed title length.")
+    parser.add_argument('--fields', type=int, default=4, help="Number of fields per embed.")
+    parser.add_argument('--hit-ratio', type=float, default=0.05, help="Fraction of messages that match a filter.")
+    parser.add_argument('--seed', type=int, default=0, help="Workload seed; keep it fixed to compare runs.")
+    parser.add_argument('--dedup', action='store_true', help="Keep the duplicate-alert cache enabled.")
+    parser.add_argument('--match-executor', choices=MATCH_MODES, default='inline', help="Where matching runs.")
+    parser.add_argument('--offload-threshold', type=int, default=0, help="Filter count from which matching is offloaded.")
+    parser.add_argument('--ingest-workers', type=int, default=0, help="Ingest worker tasks; 0 matches inside on_message.")
+    parser.add_argument('--ingest-queue-size', type=int, default=1000, help="Ingest queue size.")
+    parser.add_argument('--ingest-overflow', choices=OVERFLOW_POLICIES, default='drop_oldest', help="Ingest overflow policy.")
+    parser.add_argument('--webhook-server', action='store_true', help="Send alerts to a local aiohttp server instead of a stub.")
+    parser.add_argument('--output', help="Write the results as JSON to this file.")
+    parser.add_argument('--baseline', help="Compare against a previous --output file.")
+    parser.add_argument('--single', type=int, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def main() -> None:
+    args = parse_args()
+
+    # Keep per-match log lines out of the measurements
+    logging.getLogger('discord').setLevel(logging.WARNING)
+
+    if args.single is not None:
+        print(json.dumps(asyncio.run(run_once(args.single, args))))
+        return
+
+    print(f"{'filters':>8} {'compile ms':>11} {'p50 ms':>9} {'p99 ms':>9} {'msg/s':>10} {'peak MB':>8}")
+    results = []
+    for filter_count in args.filters:
+        results.append(run_isolated(filter_count, args))
+        print_row(results[-1])
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {
+            'messages': args.messages,
+            'title_length': args.title_length,
+            'fields': args.fields,
+            'hit_ratio': args.hit_ratio,
+            'seed': args.seed,
+            'dedup': args.dedup,
+            'match_executor': args.match_executor,
+            'offload_threshold': args.offload_threshold,
+            'ingest_workers': args.ingest_workers,
+            'ingest_queue_size': args.ingest_queue_size,
+            'ingest_overflow': args.ingest_overflow,
+            'webhook_server': args.webhook_server
+        },
+        'results': results
+    }
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            compare(results, json.load(f))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
+
+if __name__ == '__main__':
+    main()
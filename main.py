@@ -1,69 +1,111 @@
+# Startup timing begins before anything else is imported
+from src.utilities.startup import startup_timer
+
 # System imports
 import asyncio
 import aiohttp
-import os
-from typing import NoReturn, Optional
+from typing import Dict, Optional
 
 # Third-party imports
 import discord
 from discord.ext import commands
+startup_timer.mark('imports')
 
 # Project-specific imports
 from src.configuration.config import config
+startup_timer.mark('config')
 from src.configuration.debug import setup_logging
+from src.utilities.profiling import slow_callbacks
 
 # Set up logging
 logger = setup_logging()
+startup_timer.mark('logging')
+
+# Cogs loaded when the configuration has no 'cogs' manifest
+DEFAULT_COGS = ('start', 'settings', 'filters', 'moneypenny', 'metrics')
+
+def command_prefix(bot: commands.Bot, message: discord.Message) -> str:
+    """
+    Returns the current prefix, so prefix changes in the configuration apply without a restart.
+    """
+    return config['prefix']
 
 # Initialize bot with the specified prefix and configurations
-bot = commands.Bot(command_prefix=config['prefix'], self_bot=True, case_insensitive=True)
+bot = commands.Bot(command_prefix=command_prefix, self_bot=True, case_insensitive=True)
 bot.remove_command('help')  # Removing default help command
 
 # Placeholder for aiohttp session, using a type comment to avoid Pylance errors
 bot.session = None  # type: Optional[aiohttp.ClientSession]
 
-async def load_cogs() -> None:
+def cog_manifest() -> Dict[str, bool]:
+    """
+    Returns the cogs to load from the 'cogs' setting: cog module names in 'src/cogs'
+    mapped to whether they are enabled.
     """
-    Asynchronously loads all cog extensions from the 'src/cogs' directory.
+    return dict(config.get('cogs') or dict.fromkeys(DEFAULT_COGS, True))
 
-    This function iterates over each Python file in the 'src/cogs' directory 
-    and attempts to load it as an extension into the bot if the filename ends with '.py'.
-    Logs successful cog loading or errors.
+async def load_cog(name: str) -> None:
     """
-    for filename in os.listdir('./src/cogs'):
-        if filename.endswith('.py'):
-            cog_name = f'src.cogs.{filename[:-3]}'  # Strip '.py' to get cog name
-            try:
-                await bot.load_extension(cog_name)
-                logger.info(f"Loaded cog: {cog_name}")
-            except Exception as e:
-                logger.error(f"Failed to load cog {cog_name}: {e}", exc_info=True)
-
-async def main() -> NoReturn:
+    Loads a single cog extension, logging success or failure.
+
+    :param name: The cog's module name in 'src/cogs'.
     """
-    Main entry point for the bot.
+    cog_name = f'src.cogs.{name}'
+    try:
+        await bot.load_extension(cog_name)
+        logger.info(f"Loaded cog: {cog_name}")
+    except Exception as e:
+        logger.error(f"Failed to load cog {cog_name}: {e}", exc_info=True)
 
-    This function initializes the aiohttp session, loads the cogs, and starts the bot.
+async def load_cogs() -> None:
     """
-    # Initialize aiohttp session for making asynchronous HTTP requests
-    bot.session = aiohttp.ClientSession()
+    Asynchronously loads the cogs enabled in the cog manifest.
 
-    # Load bot extensions (cogs)
-    await load_cogs()
+    Cogs don't depend on each other while loading, so they are loaded concurrently:
+    while one cog awaits in its `cog_load` (starting servers, opening connections),
+    the next one is imported.
+    """
+    manifest = cog_manifest()
+    disabled = [name for name, enabled in manifest.items() if not enabled]
+    if disabled:
+        logger.info(f"Skipping disabled cogs: {', '.join(disabled)}")
 
-    # Start the bot using the token from the configuration
-    await bot.start(config['token'])
+    await asyncio.gather(*(load_cog(name) for name, enabled in manifest.items() if enabled))
 
-@bot.event
-async def on_shutdown() -> None:
+async def main() -> None:
     """
-    Event handler that is called when the bot shuts down.
+    Main entry point for the bot.
 
-    This ensures that the aiohttp session is properly closed when the bot is shutting down.
+    This function initializes the aiohttp session, loads the cogs, and starts the bot.
+    The bot is started as two steps, logging in and connecting, so both are timed.
+
+    However the bot stops, including on Ctrl-C, it is closed before returning: closing
+    unloads the cogs, which flush unsaved filter changes and queued alerts, and then the
+    aiohttp session is closed.
     """
-    if bot.session:
+    # Initialize aiohttp session for making asynchronous HTTP requests.
+    # Cogs share it so webhook connections are pooled and kept alive between alerts.
+    bot.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(keepalive_timeout=60))
+
+    try:
+        # Log any callback that blocks the event loop, from message handlers to startup work
+        slow_callbacks.configure(config.get('slow_callback_threshold', 0.1))
+
+        # Load bot extensions (cogs)
+        await load_cogs()
+        startup_timer.mark('cogs')
+
+        # Log in using the token from the configuration, then connect to the gateway.
+        # The remaining startup time is reported by the Start cog once the bot is ready.
+        await bot.login(config['token'])
+        startup_timer.mark('login')
+        await bot.connect()
+    finally:
+        await bot.close()
         await bot.session.close()
-    logger.info("Closed aiohttp session.")
+        logger.info("Closed aiohttp session.")
 
-# Run the main function inside the asyncio event loop
-asyncio.run(main())
+# Run the main function inside the asyncio event loop. Guarded, because spawned match
+# pool workers import this module too, and must not start a second bot
+if __name__ == '__main__':
+    asyncio.run(main())
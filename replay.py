@@ -0,0 +1,98 @@
+# System imports
+import argparse
+import json
+import logging
+import os
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+# Project-specific imports
+from src.configuration.config import config, resolve_path
+from src.cogs.data.backends import JsonFilterBackend, create_backend
+from src.cogs.data.fields import build_record
+from src.cogs.data.filter_store import FilterStore
+from src.utilities.capture import capture_files, read_capture
+
+def replay(files: List[str], store: FilterStore, repeat: int = 1) -> Dict[str, Any]:
+    """
+    Streams captured embeds through the same extraction and matching as the
+    MoneyPenny cog, as fast as possible and without connecting to Discord.
+
+    :param files: The capture files, in the order they were written.
+    :param store: The filters to match against.
+    :param repeat: How many times to replay the files, for steadier throughput numbers.
+    :return: The matches per filter and throughput.
+    """
+    fired: Counter = Counter()
+    embeds = matched = 0
+    size = sum(os.path.getsize(path) for path in files) * repeat
+
+    # Compiling the filters is a one-off cost, kept out of the throughput
+    store.matcher
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for path in files:
+            for entry in read_capture(path):
+                embeds += 1
+                record = build_record(entry.get('title'), entry.get('description'), entry.get('fields') or ())
+                scopes = store.scopes_for(entry.get('guild_id', 0), entry.get('channel_id', 0))
+
+                match = store.matcher_for_scopes(scopes).best_match(record)
+                if match:
+                    matched += 1
+                    fired[match.filter] += 1
+    elapsed = time.perf_counter() - started
+
+    return {
+        'files': files,
+        'filters': store.count(),
+        'embeds': embeds,
+        'matched': matched,
+        'seconds': elapsed,
+        'embeds_per_second': embeds / elapsed if elapsed else 0.0,
+        'megabytes_per_second': size / (1024 * 1024) / elapsed if elapsed else 0.0,
+        'fired': dict(fired.most_common())
+    }
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay captured Moneypenny embeds against a filter set.")
+    parser.add_argument('files', nargs='*', help="Capture files. Defaults to 'capture_file' and its rotated backups.")
+    parser.add_argument('--filters', help="A filters JSON file to test. Defaults to the configured filter backend.")
+    parser.add_argument('--repeat', type=int, default=1, help="Replay the files this many times.")
+    parser.add_argument('--top', type=int, default=20, help="Number of filters to list.")
+    parser.add_argument('--output', help="Write the full report as JSON to this file.")
+    return parser.parse_args(argv)
+
+def main() -> None:
+    args = parse_args()
+
+    # Keep per-filter warnings (e.g. skipped regexes) brief
+    logging.getLogger('discord').setLevel(logging.WARNING)
+
+    files = args.files
+    if not files and config.get('capture_file'):
+        files = capture_files(resolve_path(config['capture_file']))
+    if not files:
+        raise SystemExit("No capture files found. Set 'capture_file' in the configuration or pass files to replay.")
+
+    backend = JsonFilterBackend(args.filters) if args.filters else create_backend()
+    report = replay(files, FilterStore(backend), repeat=max(1, args.repeat))
+
+    print(
+        f"Replayed {report['embeds']} embeds against {report['filters']} filters in {report['seconds']:.2f}s "
+        f"({report['embeds_per_second']:.0f} embeds/s, {report['megabytes_per_second']:.1f} MB/s)"
+    )
+    print(f"{report['matched']} embeds matched; filters that would have fired:")
+    for filter_word, count in list(report['fired'].items())[:args.top]:
+        print(f"  {count:>8}  {filter_word}")
+    if not report['fired']:
+        print("  none")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+# System imports
+import os
+import threading
+from typing import Hashable, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# Project-specific imports
+from src.configuration.config import ROOT_DIR, config, resolve_path
+from src.cogs.data.load_filters import FILTERS_FILE_PATH, load_filter_document, save_filters
+
+# Define the default path of the SQLite filters database
+FILTERS_DB_PATH = os.path.join(ROOT_DIR, 'src', 'cogs', 'data', 'filters.db')
+
+class FilterScope(NamedTuple):
+    """
+    Where a filter applies. 0 means "any": the default scope is global, a scope with
+    only a guild ID applies to the whole guild, and one with a channel ID to that channel.
+    """
+    guild_id: int = 0
+    channel_id: int = 0
+
+GLOBAL_SCOPE = FilterScope()
+
+class FilterEntry(NamedTuple):
+    term: str
+    scope: FilterScope = GLOBAL_SCOPE
+
+# A pending change: ('add' | 'remove', entries)
+Operation = Tuple[str, Tuple[FilterEntry, ...]]
+
+class FilterBackend:
+    """
+    Persistent storage for the filters behind the in-memory `FilterStore`.
+    """
+
+    def signature(self) -> Hashable:
+        """
+        :return: A value that changes whenever the stored filters are modified externally.
+        """
+        raise NotImplementedError
+
+    def load(self) -> List[FilterEntry]:
+        """
+        :return: Every stored filter, in insertion order.
+        """
+        raise NotImplementedError
+
+    def save(self, entries: Sequence[FilterEntry], operations: Sequence[Operation]) -> None:
+        """
+        Persists changes. Backends that can apply changes incrementally use `operations`;
+        others rewrite everything from `entries`.
+
+        :param entries: Every current filter.
+        :param operations: The changes made since the last save, in order.
+        """
+        raise NotImplementedError
+
+class JsonFilterBackend(FilterBackend):
+    """
+    Stores the filters in 'filters.json', rewriting the whole file on every save.
+    """
+
+    def __init__(self, path: str = FILTERS_FILE_PATH, fsync: bool = True) -> None:
+        self.path = path
+        self.fsync = fsync
+
+    def signature(self) -> Optional[Tuple[int, int, int]]:
+        """
+        :return: The file's (inode, mtime in ns, size), or `None` if it doesn't exist.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def load(self) -> List[FilterEntry]:
+        document = load_filter_document(self.path)
+
+        entries = [FilterEntry(term) for term in document.get('filters', [])]
+        entries.extend(
+            FilterEntry(item['filter'], FilterScope(item.get('guild_id', 0), item.get('channel_id', 0)))
+            for item in document.get('scoped', [])
+        )
+        return entries
+
+    def save(self, entries: Sequence[FilterEntry], operations: Sequence[Operation]) -> None:
+        global_filters = [entry.term for entry in entries if entry.scope == GLOBAL_SCOPE]
+        scoped = [
+            {'filter': entry.term, 'guild_id': entry.scope.guild_id, 'channel_id': entry.scope.channel_id}
+            for entry in entries if entry.scope != GLOBAL_SCOPE
+        ]
+        save_filters(global_filters, self.path, fsync=self.fsync, scoped=scoped)
+
+class SqliteFilterBackend(FilterBackend):
+    """
+    Stores the filters in an indexed SQLite table and applies changes incrementally,
+    so adding or removing a filter never rewrites the whole list.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS filters (
+            id INTEGER PRIMARY KEY,
+            term TEXT NOT NULL,
+            guild_id INTEGER NOT NULL DEFAULT 0,
+            channel_id INTEGER NOT NULL DEFAULT 0,
+            UNIQUE (term, guild_id, channel_id)
+        );
+        CREATE INDEX IF NOT EXISTS filters_scope ON filters (guild_id, channel_id);
+    """
+
+    def __init__(self, path: str = FILTERS_DB_PATH, fsync: bool = True, import_path: Optional[str] = FILTERS_FILE_PATH) -> None:
+        """
+        Opens (and if needed creates) the database.
+
+        :param path: The path of the SQLite database.
+        :param fsync: Whether commits are synced to disk (synchronous=FULL) or not (NORMAL).
+        :param import_path: A filters JSON file to import when the database is first created.
+        """
+        self.path = path
+
+        # Writes happen in executor threads; the lock serializes every use of the connection
+        self._lock = threading.Lock()
+        # Imported here so JSON-backed setups don't pay for loading SQLite at startup
+        import sqlite3
+
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute(f"PRAGMA synchronous={'FULL' if fsync else 'NORMAL'}")
+
+        with self._lock:
+            self._connection.executescript(self.SCHEMA)
+            empty = self._connection.execute('SELECT NOT EXISTS (SELECT 1 FROM filters)').fetchone()[0]
+
+        if empty and import_path and os.path.exists(import_path):
+            self.insert(JsonFilterBackend(import_path).load())
+
+    def signature(self) -> int:
+        """
+        :return: SQLite's data version, which changes when another connection commits.
+        """
+        with self._lock:
+            return self._connection.execute('PRAGMA data_version').fetchone()[0]
+
+    def load(self) -> List[FilterEntry]:
+        with self._lock:
+            rows = self._connection.execute('SELECT term, guild_id, channel_id FROM filters ORDER BY id').fetchall()
+        return [FilterEntry(term, FilterScope(guild_id, channel_id)) for term, guild_id, channel_id in rows]
+
+    def _rows(self, entries: Iterable[FilterEntry]) -> List[Tuple[str, int, int]]:
+        return [(entry.term, entry.scope.guild_id, entry.scope.channel_id) for entry in entries]
+
+    def insert(self, entries: Iterable[FilterEntry]) -> None:
+        """
+        Inserts filters in a single transaction, ignoring ones that already exist.
+
+        :param entries: The filters to insert.
+        """
+        self.save((), [('add', tuple(entries))])
+
+    def save(self, entries: Sequence[FilterEntry], operations: Sequence[Operation]) -> None:
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute('BEGIN')
+            try:
+                for action, changed in operations:
+                    if action == 'add':
+                        cursor.executemany(
+                            'INSERT OR IGNORE INTO filters (term, guild_id, channel_id) VALUES (?, ?, ?)',
+                            self._rows(changed)
+                        )
+                    else:
+                        cursor.executemany(
+                            'DELETE FROM filters WHERE term = ? AND guild_id = ? AND channel_id = ?',
+                            self._rows(changed)
+                        )
+                cursor.execute('COMMIT')
+            except BaseException:
+                cursor.execute('ROLLBACK')
+                raise
+
+def create_backend() -> FilterBackend:
+    """
+    Creates the filter backend selected by 'filters_backend' in the configuration.
+
+    :return: A SQLite backend if configured, otherwise the JSON file backend.
+    """
+    fsync = config.get('filters_fsync', True)
+
+    if config.get('filters_backend', 'json') == 'sqlite':
+        return SqliteFilterBackend(resolve_path(config.get('filters_db_path', FILTERS_DB_PATH)), fsync=fsync)
+    return JsonFilterBackend(fsync=fsync)
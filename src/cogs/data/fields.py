@@ -0,0 +1,330 @@
+# System imports
+import heapq
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, List, NamedTuple, Optional, Pattern, Set, Tuple
+
+# Third-party imports
+import discord
+
+# Project-specific imports
+from src.cogs.data.matcher import FilterMatcher, Match
+from src.cogs.data.syntax import INFINITY, FilterSpec, FilterSyntaxError, PriceRange, is_word_char, parse_filter, parse_number
+
+# Logger
+from src.configuration.debug import setup_logging
+logger = setup_logging()
+
+# Numbers such as '1,250' or '499.99' in a price field
+PRICE_NUMBER = re.compile(r'\d[\d,]*(?:\.\d+)?')
+
+def field_key(name: Optional[str]) -> str:
+    """
+    Normalizes an embed field name, so 'Address', 'address:' and ' ADDRESS ' are the same field.
+
+    :param name: The field name.
+    :return: The normalized name.
+    """
+    return (name or '').strip().rstrip(':').strip().lower()
+
+class EmbedRecord(NamedTuple):
+    """
+    The searchable parts of an embed, extracted once and shared by every filter.
+    """
+    texts: Dict[str, str]  # Title, description and named field values, by normalized name
+    price: Optional[float] = None  # The first number in the price field, if any
+    price_span: Tuple[int, int] = (0, 0)  # Where that number is in the price field's text
+
+    @property
+    def title(self) -> Optional[str]:
+        return self.texts.get('title')
+
+    @property
+    def address(self) -> Optional[str]:
+        return self.texts.get('address')
+
+def build_record(title: Optional[str], description: Optional[str], fields: Iterable[Tuple[str, str]]) -> EmbedRecord:
+    """
+    Builds the record of an embed from its parts. When a field name appears more
+    than once, the first field wins.
+
+    :param title: The embed title.
+    :param description: The embed description.
+    :param fields: The embed's (name, value) field pairs, in order.
+    :return: The normalized record.
+    """
+    texts: Dict[str, str] = {}
+    if title:
+        texts['title'] = title
+    if description:
+        texts['description'] = description
+
+    for name, value in fields:
+        key = field_key(name)
+        if key and value and key not in texts:
+            texts[key] = value
+
+    price_text = texts.get('price')
+    number = PRICE_NUMBER.search(price_text) if price_text else None
+    if number is None:
+        return EmbedRecord(texts)
+    return EmbedRecord(texts, parse_number(number.group()), number.span())
+
+def extract_record(embed: discord.Embed) -> EmbedRecord:
+    """
+    Extracts the title, description and named fields of an embed.
+
+    :param embed: The embed.
+    :return: The normalized record.
+    """
+    return build_record(embed.title, embed.description, ((field.name, field.value) for field in embed.fields))
+
+class PriceIndex:
+    """
+    Finds the highest priority price range containing a price with a single binary search.
+
+    The range bounds split the number line into elementary slots: each bound itself,
+    and the open interval before, between and after them. The best range covering each
+    slot is computed once when compiling, so lookups don't depend on the number of ranges.
+    """
+
+    def __init__(self, ranges: Iterable[Tuple[int, PriceRange]]) -> None:
+        """
+        :param ranges: (priority, range) pairs; lower priorities win.
+        """
+        ranges = list(ranges)
+        self._points: List[float] = sorted({
+            bound for _, price_range in ranges for bound in (price_range.low, price_range.high)
+            if bound not in (-INFINITY, INFINITY)
+        })
+        slots = 2 * len(self._points) + 1
+
+        # Ranges starting in each slot, as (priority, last slot) pairs
+        starts: List[List[Tuple[int, int]]] = [[] for _ in range(slots)]
+        for priority, price_range in ranges:
+            first, last = self._first_slot(price_range), self._last_slot(price_range)
+            if first <= last:
+                starts[first].append((priority, last))
+
+        # Sweep the slots, keeping the ranges that cover the current one in a heap
+        self._best: List[Optional[int]] = []
+        covering: List[Tuple[int, int]] = []
+        for slot in range(slots):
+            for item in starts[slot]:
+                heapq.heappush(covering, item)
+            while covering and covering[0][1] < slot:
+                heapq.heappop(covering)
+            self._best.append(covering[0][0] if covering else None)
+
+    def _slot(self, value: float) -> int:
+        """
+        :return: The slot of a value: odd for a bound, even for the interval before it.
+        """
+        index = bisect_left(self._points, value)
+        if index < len(self._points) and self._points[index] == value:
+            return 2 * index + 1
+        return 2 * index
+
+    def _first_slot(self, price_range: PriceRange) -> int:
+        if price_range.low == -INFINITY:
+            return 0
+        slot = self._slot(price_range.low)
+        return slot if price_range.low_inclusive else slot + 1
+
+    def _last_slot(self, price_range: PriceRange) -> int:
+        if price_range.high == INFINITY:
+            return 2 * len(self._points)
+        slot = self._slot(price_range.high)
+        return slot if price_range.high_inclusive else slot - 1
+
+    def lookup(self, price: float) -> Optional[int]:
+        """
+        :param price: The price.
+        :return: The priority of the best range containing the price, or `None`.
+        """
+        return self._best[self._slot(price)]
+
+
+class FieldProgram:
+    """
+    The compiled filters targeting a single field.
+
+    Substring and whole-word filters, and the words of '+A -B' filters, share one
+    Aho-Corasick automaton, so the field is scanned once however many of them there are.
+    Regex filters are combined into one alternation that rejects non-matching text in a
+    single pass; only when it matches are the individual patterns run to find the best one.
+    """
+
+    def __init__(self, specs: Iterable[Tuple[int, FilterSpec]]) -> None:
+        """
+        :param specs: (priority, filter) pairs targeting this field, in priority order.
+        """
+        # Unique case-folded literals and, per literal, the best filter using it
+        literals: Dict[str, int] = {}
+        self._substrings: Dict[int, int] = {}
+        self._words: Dict[int, int] = {}
+
+        # '+A -B' filters as (priority, required literals, excluded literals), indexed
+        # by their first required literal so only filters whose words occur are checked
+        self._combinations: Dict[int, List[Tuple[int, Tuple[int, ...], Tuple[int, ...]]]] = {}
+        self._word_literals: Set[int] = set()
+
+        regexes: List[Tuple[int, str]] = []
+
+        def literal(text: str) -> int:
+            return literals.setdefault(text.lower(), len(literals))
+
+        for priority, spec in specs:
+            if spec.kind == 'regex':
+                regexes.append((priority, spec.pattern))
+            elif spec.kind == 'all':
+                required = tuple(literal(word) for word in spec.required)
+                excluded = tuple(literal(word) for word in spec.excluded)
+                self._word_literals.update(required + excluded)
+                self._combinations.setdefault(required[0], []).append((priority, required, excluded))
+            elif spec.kind == 'word':
+                index = literal(spec.pattern)
+                self._word_literals.add(index)
+                self._words.setdefault(index, priority)
+            else:
+                self._substrings.setdefault(literal(spec.pattern), priority)
+
+        self._automaton = FilterMatcher(literals)
+        # Each pattern is grouped so its alternatives stay its own in the combined prefilter
+        self._regexes = [(priority, re.compile(f"(?:{pattern})", re.IGNORECASE)) for priority, pattern in regexes]
+        self._any_regex: Optional[Pattern[str]] = None
+        if len(regexes) > 1:
+            try:
+                self._any_regex = re.compile('|'.join(f"(?:{pattern})" for _, pattern in regexes), re.IGNORECASE)
+            except re.error as e:
+                # Each pattern compiles on its own, so they are searched one by one instead
+                logger.warning(f"Regex filters can't be combined ({e}), searching them separately.")
+
+    def best_match(self, text: str) -> Optional[Tuple[int, int, int]]:
+        """
+        :param text: The field's text.
+        :return: The (priority, start, end) of the best matching filter, or `None`.
+        """
+        best: Optional[Tuple[int, int, int]] = None
+
+        # Word occurrences found so far, by literal: the first occurrence's span
+        words: Dict[int, Tuple[int, int]] = {}
+        word_literals = self._word_literals
+
+        for match in self._automaton.find_all(text):
+            index = match.priority
+
+            priority = self._substrings.get(index)
+            if priority is not None and (best is None or (priority, match.start) < best[:2]):
+                best = (priority, match.start, match.end)
+
+            if index in word_literals and index not in words and self._is_whole_word(text, match.start, match.end):
+                words[index] = (match.start, match.end)
+
+                priority = self._words.get(index)
+                if priority is not None and (best is None or (priority, match.start) < best[:2]):
+                    best = (priority, match.start, match.end)
+
+        for index in words:
+            for priority, required, excluded in self._combinations.get(index, ()):
+                if best is not None and priority > best[0]:
+                    continue
+                if all(word in words for word in required) and not any(word in words for word in excluded):
+                    start, end = words[required[0]]
+                    if best is None or (priority, start) < best[:2]:
+                        best = (priority, start, end)
+
+        if self._regexes and (self._any_regex is None or self._any_regex.search(text)):
+            for priority, pattern in self._regexes:
+                if best is not None and priority > best[0]:
+                    break
+                match = pattern.search(text)
+                if match:
+                    best = (priority, match.start(), match.end())
+                    break
+
+        return best
+
+    @staticmethod
+    def _is_whole_word(text: str, start: int, end: int) -> bool:
+        """
+        :return: True if the span isn't directly preceded or followed by another word character.
+        """
+        if start > 0 and is_word_char(text[start]) and is_word_char(text[start - 1]):
+            return False
+        if end < len(text) and is_word_char(text[end - 1]) and is_word_char(text[end]):
+            return False
+        return True
+
+class FieldMatcher:
+    """
+    The filters compiled into a single program evaluated once per embed record.
+
+    Filters are grouped by the field they target into a `FieldProgram` each, so every
+    field with filters is scanned once no matter how many filters target it. Price
+    ranges are looked up in a `PriceIndex`.
+    """
+
+    def __init__(self, filters: Iterable[str]) -> None:
+        """
+        Compiles the program for the given filters. Filters that can't be compiled
+        (e.g. an unsafe regex edited into the filters file) are skipped.
+
+        :param filters: The filters to compile, in priority order.
+        """
+        self.filters: Tuple[str, ...] = tuple(filters)
+
+        by_field: Dict[str, List[Tuple[int, FilterSpec]]] = {}
+        ranges: List[Tuple[int, PriceRange]] = []
+
+        for priority, filter_word in enumerate(self.filters):
+            try:
+                spec = parse_filter(filter_word)
+            except (FilterSyntaxError, re.error) as e:
+                logger.warning(f"Skipping filter '{filter_word}': {e}")
+                continue
+
+            if spec.kind == 'price':
+                ranges.append((priority, spec.price_range))
+            elif spec.pattern or spec.required:
+                by_field.setdefault(spec.field, []).append((priority, spec))
+
+        self._fields: List[Tuple[str, FieldProgram]] = [
+            (field, FieldProgram(specs)) for field, specs in by_field.items()
+        ]
+        self._prices: Optional[PriceIndex] = PriceIndex(ranges) if ranges else None
+        self._size = sum(len(specs) for specs in by_field.values()) + len(ranges)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def best_match(self, record: EmbedRecord) -> Optional[Match]:
+        """
+        Returns the match of the first filter in list order, at its first occurrence
+        in the field it targets.
+
+        :param record: The embed record to match.
+        :return: The highest priority match, or `None` if no filter matches.
+        """
+        best: Optional[Match] = None
+        texts = record.texts
+
+        for field, program in self._fields:
+            text = texts.get(field)
+            if not text:
+                continue
+
+            found = program.best_match(text)
+            if found is None:
+                continue
+
+            priority, start, end = found
+            if best is None or (priority, start) < (best.priority, best.start):
+                best = Match(self.filters[priority], start, end, priority, field)
+
+        if self._prices is not None and record.price is not None:
+            priority = self._prices.lookup(record.price)
+            if priority is not None and (best is None or priority < best.priority):
+                best = Match(self.filters[priority], *record.price_span, priority, 'price')
+
+        return best
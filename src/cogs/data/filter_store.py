@@ -0,0 +1,389 @@
+# System imports
+import asyncio
+import threading
+from bisect import bisect_left
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+# Project-specific imports
+from src.configuration.config import Config, config
+from src.cogs.data.backends import GLOBAL_SCOPE, FilterBackend, FilterEntry, FilterScope, Operation, create_backend
+from src.cogs.data.fields import FieldMatcher
+from src.utilities.metrics import FILTER_RELOADS
+
+# Logger
+from src.configuration.debug import setup_logging
+logger = setup_logging()
+
+class FilterStore:
+    """
+    In-memory copy of the filters shared by every cog.
+
+    Filters are either global or scoped to a guild or channel. The backend is read
+    once and only re-read when its signature changes (e.g. the JSON file's inode,
+    modification time or size). Every change bumps `version`, which consumers can use
+    to tell whether anything derived from the filters (such as a matcher) is stale.
+
+    Changes are applied in memory immediately and written through the backend in a
+    thread executor after `save_delay` seconds, so a burst of changes results in a
+    single write and the event loop never blocks on persisting a large list.
+    """
+
+    def __init__(self, backend: Optional[FilterBackend] = None, save_delay: float = 0.5) -> None:
+        """
+        Initializes an empty store; the filters are loaded on first access.
+
+        :param backend: Where the filters are persisted. Defaults to the configured backend.
+        :param save_delay: How long to wait for further changes before writing, in seconds.
+        """
+        self.backend = backend if backend is not None else create_backend()
+        self.save_delay = save_delay
+        self.version = 0
+
+        # The per-scope lists are replaced, never mutated, so they can be handed to another thread
+        self._members: Set[FilterEntry] = set()
+        self._by_scope: Dict[FilterScope, List[str]] = {}
+        self._signature: Optional[Hashable] = None
+        self._loaded = False
+
+        # Matchers compiled for the current version, keyed by the scopes they include
+        self._matchers: Dict[Tuple[FilterScope, ...], FieldMatcher] = {}
+        self._matchers_version = -1
+        self._matchers_lock = threading.Lock()  # Thread-mode match workers share the cache
+
+        # Sorted filters per scope for the current version, for listing and lookups
+        self._sorted: Dict[FilterScope, List[str]] = {}
+        self._sorted_version = -1
+
+        # Pending write state: unsaved changes, and the task that will save them
+        self._pending: List[Operation] = []
+        self._saving = False
+        self._save_task: Optional[asyncio.Task] = None
+        self._save_lock = asyncio.Lock()
+
+    def _replace(self, entries: List[FilterEntry]) -> None:
+        """
+        Swaps in a new filter list and bumps the version.
+
+        :param entries: The new filter list.
+        """
+        by_scope: Dict[FilterScope, List[str]] = {}
+        for entry in entries:
+            by_scope.setdefault(entry.scope, []).append(entry.term)
+
+        with self._matchers_lock:
+            self._members = set(entries)
+            self._by_scope = by_scope
+            self.version += 1
+
+    def _replace_scope(self, scope: FilterScope, terms: List[str]) -> None:
+        """
+        Swaps in a new filter list for a single scope and bumps the version. The
+        matchers and sorted lists of scopes that didn't change are kept.
+
+        :param scope: The scope that changed.
+        :param terms: Its new filters; a new list, not the one being replaced.
+        """
+        by_scope = dict(self._by_scope)
+        if terms:
+            by_scope[scope] = terms
+        else:
+            by_scope.pop(scope, None)
+
+        with self._matchers_lock:
+            self._by_scope = by_scope
+            self.version += 1
+            if self._matchers_version == self.version - 1:
+                self._matchers = {scopes: matcher for scopes, matcher in self._matchers.items() if scope not in scopes}
+                self._matchers_version = self.version
+
+        if self._sorted_version == self.version - 1:
+            self._sorted.pop(scope, None)
+            self._sorted_version = self.version
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self.reload(force=True)
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Re-reads the backend if it changed since it was last read or written.
+
+        :param force: Re-read the backend even if its signature is unchanged.
+        :return: True if the filters were reloaded, False otherwise.
+        """
+        # Never let stored filters overwrite changes that haven't been written yet
+        if self._loaded and (self._pending or self._saving):
+            return False
+
+        signature = self.backend.signature()
+        if not force and self._loaded and signature == self._signature:
+            return False
+
+        self._replace(self.backend.load())
+        self._signature = signature
+        self._loaded = True
+
+        FILTER_RELOADS.inc('disk')
+        return True
+
+    def _write(self, by_scope: Dict[FilterScope, List[str]], operations: List[Operation]) -> None:
+        """
+        Persists changes and remembers the resulting backend signature,
+        so the write isn't picked up as an external change by `reload`.
+
+        :param by_scope: Every current filter, per scope.
+        :param operations: The changes to persist.
+        """
+        entries = [FilterEntry(term, scope) for scope, terms in by_scope.items() for term in terms]
+        self.backend.save(entries, operations)
+        self._signature = self.backend.signature()
+
+    def _persist(self, operation: Operation) -> None:
+        """
+        Schedules a change to be saved. Outside of an event loop the change is
+        written immediately instead.
+
+        :param operation: The change that was applied in memory.
+        """
+        FILTER_RELOADS.inc('command')
+        self._pending.append(operation)
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            operations, self._pending = self._pending, []
+            self._write(self._by_scope, operations)
+            return
+
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.create_task(self._save_later())
+
+    async def _save_later(self) -> None:
+        """
+        Waits for further changes, then saves them.
+        """
+        await asyncio.sleep(self.save_delay)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Failed to save filters: {e}", exc_info=True)
+
+    async def flush(self) -> None:
+        """
+        Writes any unsaved changes now, in a thread executor, until none are left.
+        """
+        loop = asyncio.get_running_loop()
+
+        async with self._save_lock:
+            while self._pending:
+                operations, self._pending = self._pending, []
+                self._saving = True
+                try:
+                    await loop.run_in_executor(None, self._write, self._by_scope, operations)
+                except Exception:
+                    self._pending[:0] = operations
+                    raise
+                finally:
+                    self._saving = False
+
+    def count(self, scope: Optional[FilterScope] = None) -> int:
+        """
+        :param scope: The scope to count, or `None` for every scope.
+        :return: The number of filters.
+        """
+        self._ensure_loaded()
+        if scope is None:
+            return len(self._members)
+        return len(self._by_scope.get(scope, ()))
+
+    def snapshot(self, scopes: Optional[Iterable[FilterScope]] = None) -> Dict[FilterScope, Tuple[str, ...]]:
+        """
+        :param scopes: The scopes to include, or `None` for every scope.
+        :return: The filters of the scopes, e.g. to hand to another process.
+        """
+        self._ensure_loaded()
+        if scopes is None:
+            scopes = self._by_scope
+        return {scope: tuple(self._by_scope.get(scope, ())) for scope in scopes}
+
+    def sorted_filters(self, scope: FilterScope = GLOBAL_SCOPE) -> List[str]:
+        """
+        Returns the filters of a scope in sorted order. The list is built once per
+        version and shared, so it must not be modified.
+
+        :param scope: The scope to list.
+        :return: The sorted filters.
+        """
+        self._ensure_loaded()
+        if self._sorted_version != self.version:
+            self._sorted = {}
+            self._sorted_version = self.version
+
+        index = self._sorted.get(scope)
+        if index is None:
+            index = self._sorted[scope] = sorted(self._by_scope.get(scope, ()))
+        return index
+
+    def search(self, query: str, scope: FilterScope = GLOBAL_SCOPE, prefix: bool = False) -> List[str]:
+        """
+        Finds filters of a scope, in sorted order.
+
+        :param query: The normalized text to look for.
+        :param scope: The scope to search.
+        :param prefix: Only find filters starting with the query, using a binary search of the sorted index.
+        :return: The matching filters.
+        """
+        index = self.sorted_filters(scope)
+        if not prefix:
+            return [filter_word for filter_word in index if query in filter_word]
+
+        start = bisect_left(index, query)
+        end = start
+        while end < len(index) and index[end].startswith(query):
+            end += 1
+        return index[start:end]
+
+    @property
+    def matcher(self) -> FieldMatcher:
+        """
+        The compiled matcher for the global filters.
+        """
+        return self.matcher_for_scopes((GLOBAL_SCOPE,))
+
+    def scopes_for(self, guild_id: int = 0, channel_id: int = 0) -> Tuple[FilterScope, ...]:
+        """
+        Returns the scopes whose filters apply to a channel: global, then the guild's,
+        then the channel's own. Only scopes that actually have filters are included, so
+        channels without scoped filters all share the global matcher.
+
+        :param guild_id: The guild the message was posted in, or 0 for DMs.
+        :param channel_id: The channel the message was posted in.
+        :return: The applicable scopes, in priority order.
+        """
+        self._ensure_loaded()
+
+        by_scope = self._by_scope
+        scopes: Tuple[FilterScope, ...] = (GLOBAL_SCOPE,)
+        if guild_id and FilterScope(guild_id, 0) in by_scope:
+            scopes += (FilterScope(guild_id, 0),)
+        if channel_id and FilterScope(guild_id, channel_id) in by_scope:
+            scopes += (FilterScope(guild_id, channel_id),)
+        return scopes
+
+    def matcher_for_scopes(self, scopes: Tuple[FilterScope, ...]) -> FieldMatcher:
+        """
+        Returns the cached matcher for the scopes, compiling it if the filters changed.
+
+        :param scopes: The scopes whose filters are included, in priority order.
+        :return: The compiled matcher.
+        """
+        self._ensure_loaded()
+
+        with self._matchers_lock:
+            # The filters and the version are swapped together under the lock, so the
+            # filters read here are exactly those of this version
+            version = self.version
+            by_scope = self._by_scope
+            if self._matchers_version != version:
+                self._matchers = {}
+                self._matchers_version = version
+            matcher = self._matchers.get(scopes)
+
+        if matcher is None:
+            # Compiled outside the lock so workers matching other scopes aren't held up
+            terms = [term for scope in scopes for term in by_scope.get(scope, ())]
+            matcher = FieldMatcher(terms)
+            with self._matchers_lock:
+                # Not cached if the filters changed meanwhile; the next call compiles the new ones
+                if self._matchers_version == version:
+                    matcher = self._matchers.setdefault(scopes, matcher)
+        return matcher
+
+    def __len__(self) -> int:
+        return self.count(GLOBAL_SCOPE)
+
+    def add(self, filter_word: str, scope: FilterScope = GLOBAL_SCOPE) -> bool:
+        """
+        Adds a filter and saves it.
+
+        :param filter_word: The filter to add.
+        :param scope: Where the filter applies.
+        :return: True if the filter was added, False if it already existed.
+        """
+        return self.add_many([filter_word], scope) == 1
+
+    def add_many(self, filter_words: Iterable[str], scope: FilterScope = GLOBAL_SCOPE) -> int:
+        """
+        Adds many filters as a single change, skipping ones that already exist.
+
+        :param filter_words: The filters to add.
+        :param scope: Where the filters apply.
+        :return: The number of filters that were added.
+        """
+        self._ensure_loaded()
+
+        added: List[FilterEntry] = []
+        new_members: Set[FilterEntry] = set()
+        for filter_word in filter_words:
+            entry = FilterEntry(filter_word, scope)
+            if entry not in self._members and entry not in new_members:
+                new_members.add(entry)
+                added.append(entry)
+
+        if added:
+            self._members |= new_members
+            self._replace_scope(scope, self._by_scope.get(scope, []) + [entry.term for entry in added])
+            self._persist(('add', tuple(added)))
+        return len(added)
+
+    def remove(self, filter_word: str, scope: FilterScope = GLOBAL_SCOPE) -> bool:
+        """
+        Removes a filter and saves the change.
+
+        :param filter_word: The filter to remove.
+        :param scope: The scope the filter was added to.
+        :return: True if the filter was removed, False if it didn't exist.
+        """
+        return self.remove_many([filter_word], scope) == 1
+
+    def remove_many(self, filter_words: Iterable[str], scope: FilterScope = GLOBAL_SCOPE) -> int:
+        """
+        Removes many filters as a single change, skipping ones that don't exist.
+
+        :param filter_words: The filters to remove.
+        :param scope: The scope the filters were added to.
+        :return: The number of filters that were removed.
+        """
+        self._ensure_loaded()
+
+        removed = {FilterEntry(filter_word, scope) for filter_word in filter_words} & self._members
+        if removed:
+            self._members -= removed
+            removed_terms = {entry.term for entry in removed}
+            self._replace_scope(scope, [term for term in self._by_scope.get(scope, ()) if term not in removed_terms])
+            self._persist(('remove', tuple(removed)))
+        return len(removed)
+
+    def clear(self, scope: FilterScope = GLOBAL_SCOPE) -> int:
+        """
+        Removes every filter of a scope and saves the change.
+
+        :param scope: The scope to clear.
+        :return: The number of filters that were removed.
+        """
+        self._ensure_loaded()
+
+        removed = tuple(FilterEntry(term, scope) for term in self._by_scope.get(scope, ()))
+        if removed:
+            self._members.difference_update(removed)
+            self._replace_scope(scope, [])
+            self._persist(('remove', removed))
+        return len(removed)
+
+# Shared store used by every cog
+filter_store = FilterStore(save_delay=config.get('filters_save_delay', 0.5))
+
+def _apply_save_delay(snapshot: Config) -> None:
+    filter_store.save_delay = snapshot.get('filters_save_delay', 0.5)
+
+config.subscribe(_apply_save_delay)
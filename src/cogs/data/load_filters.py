@@ -1,11 +1,32 @@
 # System imports
 import json
-from typing import List
+import os
+import tempfile
+from typing import Any, Dict, List, Optional
+
+# Project-specific imports
+from src.configuration.config import ROOT_DIR
 
 # Define the path to the filters JSON file
-FILTERS_FILE_PATH = 'src/cogs/data/filters.json'
+FILTERS_FILE_PATH = os.path.join(ROOT_DIR, 'src', 'cogs', 'data', 'filters.json')
+
+def load_filter_document(path: str = FILTERS_FILE_PATH) -> Dict[str, Any]:
+    """
+    Loads the whole filters JSON document.
+
+    Besides the global 'filters' list, the document may hold a 'scoped' list of
+    `{"filter", "guild_id", "channel_id"}` objects for guild or channel specific filters.
+
+    :param path: The path of the filters JSON file.
+    :return: The parsed document, or an empty document if the file doesn't exist.
+    """
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'filters': []}
 
-def load_filters() -> List[str]:
+def load_filters(path: str = FILTERS_FILE_PATH) -> List[str]:
     """
     Loads the global filters from a JSON file.
 
@@ -14,24 +35,58 @@ def load_filters() -> List[str]:
 
     If the file is not found, it returns an empty list.
 
+    :param path: The path of the filters JSON file.
     :return: A list containing all the filters, or an empty list if the file doesn't exist.
     """
-    try:
-        with open(FILTERS_FILE_PATH, 'r') as f:
-            data = json.load(f)
-            return data.get('filters', [])
-    except FileNotFoundError:
-        # Return an empty list if the filters file doesn't exist
-        return []
+    return load_filter_document(path).get('filters', [])
 
-def save_filters(filters: List[str]) -> None:
+def save_filters(
+    filters: List[str],
+    path: str = FILTERS_FILE_PATH,
+    fsync: bool = True,
+    scoped: Optional[List[Dict[str, Any]]] = None
+) -> None:
     """
     Saves the global filters to a JSON file.
 
     This function writes the provided list of filters into the 'filters.json' file
     located in the 'src/cogs/data/' directory, overwriting any existing data.
 
+    The filters are written to a temporary file next to the target which then replaces
+    it atomically, so a crash mid-write never leaves a truncated 'filters.json' behind.
+
     :param filters: The list of filters to save.
+    :param path: The path of the filters JSON file.
+    :param fsync: Flush the file and its directory entry to disk before returning.
+    :param scoped: Guild or channel specific filters, stored under 'scoped' if any.
     """
-    with open(FILTERS_FILE_PATH, 'w') as f:
-        json.dump({'filters': filters}, f, indent=4)
+    directory = os.path.dirname(path) or '.'
+    fd, temp_path = tempfile.mkstemp(prefix='.filters-', suffix='.tmp', dir=directory)
+
+    try:
+        # Keep the permissions of the file being replaced (mkstemp creates it as 0600)
+        try:
+            os.chmod(temp_path, os.stat(path).st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(temp_path, 0o644)
+
+        with os.fdopen(fd, 'w') as f:
+            document: Dict[str, Any] = {'filters': filters}
+            if scoped:
+                document['scoped'] = scoped
+            json.dump(document, f, indent=4)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    # Make the rename itself durable; not supported for directories on Windows
+    if fsync and os.name != 'nt':
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
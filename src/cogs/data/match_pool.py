@@ -0,0 +1,198 @@
+# System imports
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, Union
+
+# Project-specific imports
+from src.cogs.data.backends import FilterScope
+from src.cogs.data.fields import EmbedRecord, FieldMatcher
+from src.cogs.data.matcher import Match
+
+if TYPE_CHECKING:
+    from src.cogs.data.filter_store import FilterStore
+
+# Logger
+from src.configuration.debug import setup_logging, setup_worker_logging
+logger = setup_logging()
+
+MATCH_MODES = ('inline', 'thread', 'process')
+
+# State of a process pool worker: the filters version it has, the filters of the scopes
+# it was sent for that version, and the matchers compiled from them
+_worker_version = -1
+_worker_filters: Dict[FilterScope, Tuple[str, ...]] = {}
+_worker_matchers: Dict[Tuple[FilterScope, ...], FieldMatcher] = {}
+
+# Returned by a worker that doesn't have the filters a match needs
+STALE = 'stale'
+
+def _init_worker() -> None:
+    """
+    Process pool initializer: logs straight to stderr, e.g. warnings about filters
+    that can't be compiled.
+    """
+    setup_worker_logging()
+
+def _match_in_worker(
+    version: int,
+    scopes: Tuple[FilterScope, ...],
+    record: EmbedRecord,
+    filters: Optional[Dict[FilterScope, Tuple[str, ...]]] = None
+) -> Union[Match, None, str]:
+    """
+    Matches a record in a process pool worker, compiling the scopes' matcher on first use.
+
+    :param version: The filters version to match against.
+    :param scopes: The scopes whose filters apply, in priority order.
+    :param record: The embed record to match.
+    :param filters: The filters of the scopes at `version`, if the worker may not have them.
+    :return: The best match, `None`, or `STALE` if the worker needs `filters` to be sent.
+    """
+    global _worker_version
+
+    if version != _worker_version:
+        if filters is None:
+            return STALE
+        _worker_version = version
+        _worker_filters.clear()
+        _worker_matchers.clear()
+
+    if filters is not None:
+        _worker_filters.update(filters)
+    elif any(scope not in _worker_filters for scope in scopes):
+        return STALE
+
+    matcher = _worker_matchers.get(scopes)
+    if matcher is None:
+        terms = [term for scope in scopes for term in _worker_filters[scope]]
+        matcher = _worker_matchers[scopes] = FieldMatcher(terms)
+    return matcher.best_match(record)
+
+class MatchPool:
+    """
+    Runs matching off the event loop once the filter set is large enough for it to matter.
+
+    - 'inline' matches on the event loop.
+    - 'thread' matches in a thread pool that shares the store's compiled matchers.
+    - 'process' matches in a process pool whose workers each compile their own copy of
+      the filters. Workers live as long as the pool and are told the filters version
+      with every match; a worker that doesn't have the filters of a match's scopes at
+      that version answers `STALE`, and the match is sent again with them. Each worker
+      is sent the filters once per change and recompiles only the matchers it uses.
+      Workers are spawned rather than forked, since the bot always runs other threads
+      (such as the logging listener) whose locks a forked child could inherit held.
+      They log to stderr only, not to the log file.
+
+    Below `threshold` filters, matching always stays inline, where it is cheaper than
+    handing the work to another thread or process.
+    """
+
+    def __init__(self, mode: str = 'inline', workers: Optional[int] = None, threshold: int = 5000) -> None:
+        """
+        :param mode: 'inline', 'thread' or 'process'.
+        :param workers: The number of pool workers, or `None` for the executor's default.
+        :param threshold: The number of applicable filters from which matching is offloaded.
+        """
+        self.mode = 'inline'
+        self.workers: Optional[int] = None
+        self.threshold = threshold
+
+        self._executor: Optional[Executor] = None
+
+        self.configure(mode, workers, threshold)
+
+    def configure(self, mode: str, workers: Optional[int], threshold: int) -> None:
+        """
+        Changes the settings; the pool is restarted on its next use if the mode or size changed.
+
+        :param mode: 'inline', 'thread' or 'process'.
+        :param workers: The number of pool workers, or `None` for the executor's default.
+        :param threshold: The number of applicable filters from which matching is offloaded.
+        """
+        if mode not in MATCH_MODES:
+            logger.warning(f"Unknown match mode '{mode}', matching inline.")
+            mode = 'inline'
+
+        if (mode, workers) != (self.mode, self.workers):
+            self.close()
+
+        self.mode = mode
+        self.workers = workers
+        self.threshold = threshold
+
+    def _pool(self) -> Executor:
+        """
+        Returns the executor, starting it if needed.
+
+        :return: The executor.
+        """
+        if self._executor is not None:
+            return self._executor
+
+        if self.mode == 'thread':
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='matcher')
+            return self._executor
+
+        # Imported here so the multiprocessing machinery is only loaded when it is used
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker
+        )
+        logger.debug("Started match workers.")
+        return self._executor
+
+    def offloads(self, store: 'FilterStore', scopes: Tuple[FilterScope, ...]) -> bool:
+        """
+        :param store: The filter store being matched against.
+        :param scopes: The scopes whose filters apply.
+        :return: True if matching these scopes runs in the pool.
+        """
+        if self.mode == 'inline':
+            return False
+        return sum(store.count(scope) for scope in scopes) >= self.threshold
+
+    async def best_match(self, store: 'FilterStore', scopes: Tuple[FilterScope, ...], record: EmbedRecord) -> Optional[Match]:
+        """
+        Matches a record against the filters of the scopes, inline or in the pool.
+
+        :param store: The filter store to match against.
+        :param scopes: The scopes whose filters apply, in priority order.
+        :param record: The embed record to match.
+        :return: The best match, or `None`.
+        """
+        if not self.offloads(store, scopes):
+            return store.matcher_for_scopes(scopes).best_match(record)
+
+        loop = asyncio.get_running_loop()
+        executor = self._pool()
+
+        if self.mode == 'thread':
+            return await loop.run_in_executor(executor, self._match_shared, store, scopes, record)
+
+        match = await loop.run_in_executor(executor, _match_in_worker, store.version, scopes, record)
+        if match == STALE:
+            # Read together with the version, so the worker never pairs one with the other's filters
+            match = await loop.run_in_executor(
+                executor, _match_in_worker, store.version, scopes, record, store.snapshot(scopes)
+            )
+        return match
+
+    @staticmethod
+    def _match_shared(store: 'FilterStore', scopes: Tuple[FilterScope, ...], record: EmbedRecord) -> Optional[Match]:
+        """
+        Matches in a pool thread. Compiled matchers are immutable, so threads share the
+        store's copies, and recompiling one after a change also happens off the event loop.
+        """
+        return store.matcher_for_scopes(scopes).best_match(record)
+
+    def close(self) -> None:
+        """
+        Shuts the pool down without waiting for running matches.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
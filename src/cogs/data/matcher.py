@@ -0,0 +1,133 @@
+# System imports
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+class Match(NamedTuple):
+    """
+    A single filter hit inside a piece of text.
+
+    `start` and `end` are offsets into the original (non case-folded) text, so they
+    can be used directly for slicing when highlighting the match.
+    """
+    filter: str
+    start: int
+    end: int
+    priority: int  # Position of the filter in the source list; lower wins
+    field: str = 'title'  # The embed field the text came from
+
+class FilterMatcher:
+    """
+    Aho-Corasick automaton compiled from a list of filters.
+
+    The automaton finds every filter occurring in a text in a single pass over its
+    case-folded form, independently of how many filters are loaded.
+    """
+
+    def __init__(self, filters: Iterable[str]) -> None:
+        """
+        Compiles the automaton for the given filters.
+
+        Empty filters are ignored, and filters that only differ by case are compiled
+        once, keeping the earliest one in the list.
+
+        :param filters: The filters to compile, in priority order.
+        """
+        self.filters: Tuple[str, ...] = tuple(filters)
+
+        # State 0 is the root; each state has its transitions, failure link and outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+
+        # Lengths of the case-folded patterns, indexed by priority
+        self._lengths: Dict[int, int] = {}
+
+        seen = set()
+        for priority, filter_word in enumerate(self.filters):
+            pattern = filter_word.lower()
+            if not pattern or pattern in seen:
+                continue
+            seen.add(pattern)
+            self._insert(pattern, priority)
+
+        self._build_failure_links()
+
+    def _insert(self, pattern: str, priority: int) -> None:
+        """
+        Adds a case-folded pattern to the trie.
+
+        :param pattern: The case-folded pattern.
+        :param priority: The position of the originating filter in the filter list.
+        """
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = next_state
+
+        self._out[state] += (priority,)
+        self._lengths[priority] = len(pattern)
+
+    def _build_failure_links(self) -> None:
+        """
+        Computes failure links breadth-first and merges the outputs of each state
+        with the outputs of its failure state.
+        """
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._out[next_state] += self._out[self._fail[next_state]]
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def find_all(self, text: Optional[str]) -> List[Match]:
+        """
+        Finds every filter occurrence in the text, in the order their matches end.
+
+        :param text: The text to scan. `None` or an empty string yields no matches.
+        :return: A list of matches with spans relative to the original text.
+        """
+        if not text or not self._lengths:
+            return []
+
+        folded = text.lower()
+
+        # Lower-casing can change the length of some characters (e.g. 'İ'), in which
+        # case folded offsets are mapped back onto the original text
+        offsets: Optional[List[int]] = None
+        if len(folded) != len(text):
+            offsets = []
+            for index, char in enumerate(text):
+                offsets.extend([index] * len(char.lower()))
+            offsets.append(len(text))
+
+        goto, fail, out, lengths = self._goto, self._fail, self._out, self._lengths
+        matches: List[Match] = []
+        state = 0
+
+        for index, char in enumerate(folded):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            for priority in out[state]:
+                start, end = index + 1 - lengths[priority], index + 1
+                if offsets is not None:
+                    start, end = offsets[start], offsets[end]
+                matches.append(Match(self.filters[priority], start, end, priority))
+
+        return matches
@@ -0,0 +1,464 @@
+# System imports
+import re
+from functools import lru_cache
+from typing import FrozenSet, List, NamedTuple, Optional, Tuple
+
+# Fields a filter can target with a 'FIELD:' prefix. Any other prefix is part of the
+# filter itself, so plain filters containing a colon keep matching the title.
+FILTER_FIELDS = ('title', 'description', 'address', 'price', 'category')
+
+# Filter types selected with a 'TYPE:' prefix after the optional field prefix
+WORD_TYPES = ('word',)
+REGEX_TYPES = ('re', 'regex')
+FILTER_TYPES = WORD_TYPES + REGEX_TYPES
+
+# Regex filters are limited so a single bad pattern can't stall the event loop
+MAX_REGEX_LENGTH = 200
+
+# Price predicates: '100-500' (inclusive), or a comparison such as '<500' or '>=100'
+PRICE_BETWEEN = re.compile(r'^\s*(\d[\d,]*(?:\.\d+)?)\s*-\s*(\d[\d,]*(?:\.\d+)?)\s*$')
+PRICE_COMPARISON = re.compile(r'^\s*(<=|>=|<|>)\s*(\d[\d,]*(?:\.\d+)?)\s*$')
+
+INFINITY = float('inf')
+
+class FilterSyntaxError(ValueError):
+    """
+    Raised when a filter can't be compiled, e.g. an invalid or too expensive regex.
+    """
+
+class PriceRange(NamedTuple):
+    low: float = -INFINITY
+    high: float = INFINITY
+    low_inclusive: bool = True
+    high_inclusive: bool = True
+
+class FilterSpec(NamedTuple):
+    """
+    A parsed filter. `kind` is one of:
+
+    - 'substring': `pattern` occurs anywhere in the field (plain filters, e.g. 'SOFA')
+    - 'word': `pattern` occurs as a whole word or phrase ('WORD:CAT')
+    - 'regex': `pattern` is a case-insensitive regular expression ('RE:\\d+ BED')
+    - 'all': every `required` word occurs and no `excluded` word does ('+SOFA -BROKEN')
+    - 'price': the field's price is within `price_range` ('PRICE:100-500')
+    """
+    filter: str
+    field: str = 'title'
+    kind: str = 'substring'
+    pattern: str = ''
+    required: Tuple[str, ...] = ()
+    excluded: Tuple[str, ...] = ()
+    price_range: Optional[PriceRange] = None
+
+def parse_number(text: str) -> float:
+    return float(text.replace(',', ''))
+
+def is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+def _split_prefix(text: str, names: Tuple[str, ...]) -> Tuple[Optional[str], str]:
+    """
+    Splits a known 'NAME:' prefix off a filter.
+
+    :param text: The filter text.
+    :param names: The recognized prefixes, in lower case.
+    :return: The lower-cased prefix (or `None`) and the rest of the text.
+    """
+    prefix, separator, rest = text.partition(':')
+    name = prefix.strip().lower()
+    if separator and rest.strip() and name in names:
+        return name, rest.strip()
+    return None, text
+
+def parse_price_range(text: str) -> Optional[PriceRange]:
+    """
+    :param text: The text of a 'PRICE:' filter, e.g. '100-500' or '<=250'.
+    :return: The price range, or `None` if the text isn't a price predicate.
+    """
+    between = PRICE_BETWEEN.match(text)
+    if between:
+        low, high = sorted((parse_number(between.group(1)), parse_number(between.group(2))))
+        return PriceRange(low, high)
+
+    comparison = PRICE_COMPARISON.match(text)
+    if comparison:
+        operator, value = comparison.group(1), parse_number(comparison.group(2))
+        if operator.startswith('<'):
+            return PriceRange(high=value, high_inclusive=operator == '<=')
+        return PriceRange(low=value, low_inclusive=operator == '>=')
+
+    return None
+
+# Most unbounded repetitions ('*', '+', '{n,}') a regex filter may use
+MAX_UNBOUNDED_QUANTIFIERS = 6
+
+# Bounded repetitions longer than this are treated as unbounded
+MAX_BOUNDED_REPEAT = 20
+
+# A quantifier: '*', '+', '?' or '{n}', '{n,}', '{,m}', '{n,m}', optionally lazy or possessive
+QUANTIFIER = re.compile(r'(?:[*+?]|\{(\d*)(,?)(\d*)\})[?+]?')
+
+# Inline flags that apply to the whole pattern, such as '(?s)'
+GLOBAL_FLAGS = re.compile(r'(?<!\\)\(\?[aiLmsux]+\)')
+
+# Characters tried when checking whether two parts of a regex can match the same text
+_SAMPLE_CHARACTERS = [chr(code) for code in range(0x250)] + ['\u0391', '\u0416', '\u05d0', '\u0661', '\u4e00', '\u3000']
+
+# Characters a part of a regex can match; `None` when it may match anything
+CharacterSet = Optional[FrozenSet[str]]
+
+@lru_cache(maxsize=1024)
+def _character_set(atom: str) -> CharacterSet:
+    """
+    :param atom: A single-character part of a regex: a literal, escape, class or '.'.
+    :return: The sample characters it matches, or `None` if that can't be told.
+    """
+    try:
+        compiled = re.compile(f"(?:{atom})", re.IGNORECASE)
+    except re.error:
+        return None
+    return frozenset(char for char in _SAMPLE_CHARACTERS if compiled.fullmatch(char))
+
+def _overlaps(chain: List[CharacterSet], characters: CharacterSet) -> bool:
+    """
+    :return: True if any part of the chain can match a character the new part matches.
+    """
+    return any(link is None or characters is None or link & characters for link in chain)
+
+# Most ways a regex filter may have of matching the same text, e.g. '(a|a)(a|a)' has 4
+MAX_REGEX_PATHS = 256
+
+# The leading characters of a branch that hasn't matched anything yet
+_NO_LEAD = frozenset(['no lead'])
+
+def _union(first: CharacterSet, second: CharacterSet) -> CharacterSet:
+    return None if first is None or second is None else first | second
+
+def _ambiguous(leads: List[CharacterSet]) -> bool:
+    """
+    :return: True if more than one of the alternatives can start with the same character.
+    """
+    return any(_overlaps(leads[:index], lead) for index, lead in enumerate(leads))
+
+class _Group:
+    """
+    What the regex complexity check knows about an open group.
+
+    `chain` holds the repeated parts that a following repetition could trade characters
+    with: the repetitions since the last required part that matches none of their
+    characters, plus anything in between. `optional` holds the '?' parts since then,
+    and `width` the number of ways they can match the same text.
+    """
+
+    def __init__(self, parent: Optional['_Group'] = None) -> None:
+        self.entry = list(parent.chain) if parent else []
+        self.entry_optional = list(parent.optional) if parent else []
+        self.entry_width = parent.width if parent else 1
+        self.chain = list(self.entry)
+        self.optional = list(self.entry_optional)
+        self.width = self.entry_width
+        self.branches: List[List[CharacterSet]] = []
+        self.branch_optional: List[CharacterSet] = []
+        self.branch_width = 1
+        self.characters: CharacterSet = frozenset()  # Every character the group can match
+        self.leads: List[CharacterSet] = []           # The first characters of each alternative
+        self.lead: CharacterSet = _NO_LEAD
+        self.varies = False  # Can match the same text in more than one way
+
+    def end_branch(self) -> None:
+        self.branches.append(self.chain)
+        self.branch_optional.extend(self.optional)
+        self.branch_width = max(self.branch_width, self.width)
+        self.leads.append(None if self.lead is _NO_LEAD else self.lead)
+
+    def start_branch(self) -> None:
+        self.chain = list(self.entry)
+        self.optional = list(self.entry_optional)
+        self.width = self.entry_width
+        self.lead = _NO_LEAD
+
+    def reset(self) -> None:
+        """
+        Called after a required part that none of the parts before it can match.
+        """
+        self.chain = []
+        self.optional = []
+        self.width = 1
+
+def _regex_complexity_error(pattern: str) -> Optional[str]:
+    """
+    Looks for the constructs that make a backtracking regex take exponential or high
+    polynomial time to fail on a non-matching text:
+
+    - a group repeated more than once that can match the same text in more than one
+      way, e.g. '(a+)+', '(a?){25}' or '(a|a)*'. Groups of fixed repetitions or of
+      alternatives that start differently, such as '(,\\d{3})*' or '(cat|dog)+', are fine;
+    - repetitions that can match the same characters with nothing separating them,
+      e.g. '\\w*\\w*', '.*.*', '.*a.*', '.{0,20}.{0,20}' or '\\w{1,20}\\w{1,20}'.
+      Repetitions of distinct characters, such as '\\d+\\s*bed' or '[a-z]+-[a-z]+',
+      are fine;
+    - more than `MAX_REGEX_PATHS` ways of matching the same text through optional
+      parts and alternatives, e.g. 'a?' repeated ten times or '(?:a|a)' repeated nine
+      times. Alternatives that start differently, such as '(?:cat|dog)', don't count;
+    - more than `MAX_UNBOUNDED_QUANTIFIERS` unbounded repetitions overall.
+
+    :param pattern: The regular expression.
+    :return: Why the pattern is too expensive, or `None` if it is acceptable.
+    """
+    chained = "Regex filters can't repeat the same characters twice in a row, e.g. `\\w*\\w*` or `.*a.*`."
+    nested = "Regex filters can't repeat a group that can match the same text in more than one way, e.g. `(a+)+` or `(a|a)*`."
+    ambiguous = "Regex filters can't have that many optional parts or alternatives that match the same text, e.g. `a?a?a?` or `(a|a)(a|a)`."
+
+    groups = [_Group()]
+    unbounded_count = 0
+    paths = 1  # Ways of matching the same text through ambiguous alternatives
+    index, length = 0, len(pattern)
+
+    while index < length:
+        char = pattern[index]
+        start = index
+        inner: Optional[_Group] = None
+
+        # Find the end of the next part: an escape, a class, a group or a single character
+        if char == '\\':
+            index += 2
+        elif char == '[':
+            index += 1
+            if pattern[index:index + 1] == '^':
+                index += 1
+            if pattern[index:index + 1] == ']':
+                index += 1
+            while index < length and pattern[index] != ']':
+                index += 2 if pattern[index] == '\\' else 1
+            index += 1
+        elif char == '(':
+            groups.append(_Group(groups[-1]))
+            index += 1
+            if pattern[index:index + 1] == '?':
+                # Skip the group's '?:', '?=', '?<!', '?i:' ... prefix
+                while index < length and pattern[index] not in ':)=!':
+                    index += 1
+                if pattern[index:index + 1] in (':', '=', '!'):
+                    index += 1
+            continue
+        elif char == ')':
+            if len(groups) == 1:
+                return None  # Unbalanced; left for re.compile to report
+            inner = groups.pop()
+            inner.end_branch()
+            index += 1
+        elif char == '|':
+            group = groups[-1]
+            group.end_branch()
+            group.start_branch()
+            index += 1
+            continue
+        else:
+            index += 1
+
+        group = groups[-1]
+        after: Optional[List[CharacterSet]] = None
+        if inner is not None:
+            characters = inner.characters
+            # Every branch may be taken, so the hazards of all of them carry over
+            after = list(dict.fromkeys(link for branch in inner.branches for link in branch))
+            lead: CharacterSet = frozenset()
+            for branch_lead in inner.leads:
+                lead = _union(lead, branch_lead)
+
+            if len(inner.leads) > 1 and _ambiguous(inner.leads):
+                inner.varies = True
+                paths *= len(inner.leads)
+                if paths > MAX_REGEX_PATHS:
+                    return ambiguous
+            group.varies = group.varies or inner.varies
+        else:
+            characters = _character_set(pattern[start:index])
+            lead = characters
+        group.characters = _union(group.characters, characters)
+
+        quantifier = QUANTIFIER.match(pattern, index)
+        if quantifier and quantifier.group() not in ('{}', '{,}'):
+            index = quantifier.end()
+            if quantifier.group()[0] == '{':
+                low, comma, high = quantifier.groups()
+                least = int(low or 0)
+                most: Optional[int] = int(high) if high else (None if comma else least)
+            else:
+                least = 1 if quantifier.group()[0] == '+' else 0
+                most = 1 if quantifier.group()[0] == '?' else None
+
+            if inner is not None and inner.varies and (most is None or most > 1):
+                return nested
+            if most != least:
+                group.varies = True
+        else:
+            least = most = 1
+
+        if group.lead is _NO_LEAD and not (characters is not None and not characters and inner is None):
+            group.lead = lead if least else None
+
+        if most == least:
+            # Matches a fixed number of times, so there is only one way to match it
+            if inner is not None:
+                group.chain = after or []
+                group.optional = list(dict.fromkeys(group.optional + inner.branch_optional))
+                group.width = max(group.width, inner.branch_width)
+            elif characters is not None and not characters:
+                pass  # Zero-width, such as '^' or '\\b'
+            elif not _overlaps(group.chain + group.optional, characters):
+                group.reset()
+            elif group.chain:
+                group.chain.append(characters)
+            continue
+
+        if most is None or most > MAX_BOUNDED_REPEAT:
+            unbounded_count += 1
+            if unbounded_count > MAX_UNBOUNDED_QUANTIFIERS:
+                return f"Regex filters can use at most {MAX_UNBOUNDED_QUANTIFIERS} unbounded repetitions (`*`, `+`, `{{n,}}`)."
+
+        if inner is not None:
+            # What follows may trade with the group's contents or skip it
+            group.chain = list(dict.fromkeys(group.chain + (after or [])))
+            group.width = max(group.width, inner.branch_width)
+
+        if most is None or most > 1:
+            # A repetition that can take a varying share of characters it has in common with the
+            # chain. A group only can if it may start with one of them: '\\d+(,\\d{3})*' is fine
+            if _overlaps(group.chain, lead if inner is not None and lead else characters):
+                return chained
+            if least:
+                group.reset()  # Required, and none of the parts before it can match its characters
+            group.chain = group.chain + [characters]
+        else:
+            # An optional part: each one that can match what another does doubles the ways to match
+            if _overlaps(group.chain + group.optional, characters):
+                group.width *= 2
+                if paths * group.width > MAX_REGEX_PATHS:
+                    return ambiguous
+            group.optional = group.optional + [characters]
+
+    return None
+
+def validate_regex(pattern: str) -> None:
+    """
+    Checks that a regex filter compiles, also as part of the combined alternation it is
+    matched in, and is cheap enough to run on every embed.
+
+    :param pattern: The regular expression.
+    :raises FilterSyntaxError: If the pattern is invalid or potentially slow.
+    """
+    if len(pattern) > MAX_REGEX_LENGTH:
+        raise FilterSyntaxError(f"Regex filters can be at most {MAX_REGEX_LENGTH} characters long.")
+    if re.search(r'\\[1-9]|\(\?P[<=]', pattern):
+        raise FilterSyntaxError("Regex filters can't use backreferences or named groups.")
+    if GLOBAL_FLAGS.search(pattern):
+        raise FilterSyntaxError("Regex filters can't set global flags such as `(?s)`; use a scoped group such as `(?s:...)`.")
+
+    error = _regex_complexity_error(pattern)
+    if error:
+        raise FilterSyntaxError(error)
+
+    try:
+        # Compiled the way FieldProgram combines regex filters, so anything accepted here compiles there
+        compiled = re.compile(f"(?:{pattern})", re.IGNORECASE)
+    except re.error as e:
+        raise FilterSyntaxError(f"Invalid regex: {e}") from e
+
+    # A pattern that matches empty text would match every embed
+    if compiled.search(''):
+        raise FilterSyntaxError("Regex filters must not match empty text.")
+
+def parse_filter(filter_word: str) -> FilterSpec:
+    """
+    Parses a filter of the form '[FIELD:][TYPE:]PATTERN' or '[FIELD:]+WORD -WORD ...'.
+    Filters without a known field prefix target the title, and filters without a
+    type match as a substring.
+
+    :param filter_word: The filter, e.g. 'ADDRESS:WORD:LONDON'.
+    :return: The parsed filter.
+    :raises FilterSyntaxError: If the filter is a regex that can't be used.
+    """
+    field, body = _split_prefix(filter_word, FILTER_FIELDS)
+    field = field or 'title'
+
+    kind, pattern = _split_prefix(body, FILTER_TYPES)
+    if kind in REGEX_TYPES:
+        validate_regex(pattern)
+        return FilterSpec(filter_word, field, 'regex', pattern)
+    if kind in WORD_TYPES:
+        return FilterSpec(filter_word, field, 'word', pattern)
+
+    if field == 'price':
+        price_range = parse_price_range(body)
+        if price_range is not None:
+            return FilterSpec(filter_word, field, 'price', body, price_range=price_range)
+
+    # '+SOFA -BROKEN': only when every word is marked and at least one is required
+    words = body.split()
+    if words and all(len(word) > 1 and word[0] in '+-' for word in words) and any(word[0] == '+' for word in words):
+        required = tuple(dict.fromkeys(word[1:] for word in words if word[0] == '+'))
+        excluded = tuple(dict.fromkeys(word[1:] for word in words if word[0] == '-'))
+        return FilterSpec(filter_word, field, 'all', required=required, excluded=excluded)
+
+    return FilterSpec(filter_word, field, 'substring', body)
+
+def describe_filter(spec: FilterSpec) -> str:
+    """
+    Describes what a filter matches, to complete a sentence such as "listening to anything ...".
+
+    :param spec: The parsed filter.
+    :return: The description, e.g. "whose title has the whole word 'CAT'".
+    """
+    if spec.kind == 'price' and spec.price_range is not None:
+        low, high, low_inclusive, high_inclusive = spec.price_range
+        if low != -INFINITY and high != INFINITY:
+            return f"priced between {low:g} and {high:g}"
+        if high != INFINITY:
+            return f"priced {'at most' if high_inclusive else 'under'} {high:g}"
+        return f"priced {'at least' if low_inclusive else 'over'} {low:g}"
+
+    if spec.kind == 'regex':
+        return f"whose {spec.field} matches the regex `{spec.pattern}`"
+    if spec.kind == 'word':
+        return f"whose {spec.field} has the whole word or phrase '{spec.pattern}'"
+    if spec.kind == 'all':
+        description = f"whose {spec.field} has the words {', '.join(repr(word) for word in spec.required)}"
+        if spec.excluded:
+            description += f" but none of {', '.join(repr(word) for word in spec.excluded)}"
+        return description
+    return f"whose {spec.field} includes '{spec.pattern}'"
+
+def normalize_filter(filter_word: str) -> str:
+    """
+    Normalizes a filter for storage: upper case, except for the pattern of a
+    regex filter, whose case is significant (e.g. '\\d' and '\\D').
+
+    :param filter_word: The filter as entered.
+    :return: The filter to store.
+    """
+    filter_word = filter_word.strip()
+
+    field, body = _split_prefix(filter_word, FILTER_FIELDS)
+    kind, pattern = _split_prefix(body, FILTER_TYPES)
+    if kind not in REGEX_TYPES:
+        return filter_word.upper()
+
+    prefix = f"{field.upper()}:" if field else ''
+    return f"{prefix}{kind.upper()}:{pattern}"
+
+def split_filters(text: str) -> List[str]:
+    """
+    Splits bulk-imported text into filters: one per line, or separated by commas.
+    Regex filters always take the whole line, since commas are valid inside them.
+
+    :param text: The text to split.
+    :return: The non-empty filters, in order.
+    """
+    filters: List[str] = []
+    for line in text.splitlines():
+        field, body = _split_prefix(line.strip(), FILTER_FIELDS)
+        kind, _ = _split_prefix(body, FILTER_TYPES)
+        parts = [line] if kind in REGEX_TYPES else line.split(',')
+        filters.extend(part.strip() for part in parts if part.strip())
+    return filters
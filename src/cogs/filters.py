@@ -1,11 +1,28 @@
 # Third-party imports
 import asyncio
+import io
+import os
+from typing import Dict, List, Literal, Optional
 from discord.ext import commands
 from discord.ext.commands import Context
-from discord import Message
+from discord import File, Message
 
 # Project-specific imports
-from src.cogs.data.load_filters import load_filters, save_filters
+from src.cogs.data.backends import GLOBAL_SCOPE, FilterScope
+from src.cogs.data.filter_store import filter_store
+from src.cogs.data.syntax import FilterSyntaxError, describe_filter, normalize_filter, parse_filter, split_filters
+from src.utilities.metrics import FILTER_MATCHES, FILTER_RELOADS, MATCH_SECONDS, SLOW_CALLBACKS, WEBHOOK_RESPONSES, WEBHOOK_SECONDS, registry
+from src.utilities.profiling import LoopProfiler, profile_directory, slow_callbacks
+
+# Longest profile the profile command takes, in seconds
+MAX_PROFILE_SECONDS = 300
+
+# Discord's message length limit, and how many filters are shown per page or search
+MESSAGE_LIMIT = 2000
+PAGE_SIZE = 25
+
+# Longer filters (mostly regexes) are shortened in listings; exports have them in full
+MAX_LISTED_LENGTH = 60
 
 # Logger
 from src.configuration.debug import setup_logging
@@ -19,7 +36,14 @@ class FilterCommands(commands.Cog):
         :param bot: The Discord bot instance.
         """
         self.bot = bot
-        self.filters = load_filters()
+        self.filters = filter_store
+        self.profiler = LoopProfiler()
+
+    async def cog_unload(self) -> None:
+        """
+        Writes any filter changes that are still waiting to be saved.
+        """
+        await self.filters.flush()
 
     @commands.command()
     async def help(self, ctx: Context) -> None:
@@ -36,19 +60,39 @@ class FilterCommands(commands.Cog):
             "`[]` = Optional | `<>` = Required\n\n"
             f"**{botprefix}filteradd <filter_word>** - Add a filter to the global filter list.\n"
             f"  > Example: `{botprefix}filteradd meow`\n"
-            "  > Adds 'meow' to the list of filters being tracked.\n\n"
+            "  > Adds 'meow' to the list of filters being tracked.\n"
+            "  > Prefix a filter with `description:`, `address:`, `category:` or `price:` to match another field, e.g. `price:100-500` or `price:<500`.\n"
+            "  > `word:cat` matches whole words only, `re:\\d+ bed` is a regex and `+sofa -broken` needs every `+` word and no `-` word.\n\n"
             f"**{botprefix}filterremove <filter_word>** - Remove a filter from the global filter list.\n"
             f"  > Example: `{botprefix}filterremove meow`\n"
             "  > Removes 'meow' from the list of filters being tracked.\n\n"
-            f"**{botprefix}filterlists** - Lists all the current global filters.\n"
-            f"  > Example: `{botprefix}filterlists`\n"
-            "  > Shows all filters that are being tracked.\n\n"
+            f"**{botprefix}scopedadd <guild|channel> <filter_word>** - Add a filter that only applies to this server or channel.\n"
+            f"  > Example: `{botprefix}scopedadd channel meow`\n\n"
+            f"**{botprefix}scopedremove <guild|channel> <filter_word>** - Remove a server or channel filter.\n"
+            f"  > Example: `{botprefix}scopedremove channel meow`\n\n"
+            f"**{botprefix}filterimport [global|guild|channel] [filters]** - Bulk import filters.\n"
+            f"  > Example: `{botprefix}filterimport` with a .txt attachment, one filter per line\n"
+            "  > Filters can also be given inline, separated by commas or new lines.\n\n"
+            f"**{botprefix}filterbulkremove [global|guild|channel] [filters]** - Bulk remove filters.\n"
+            "  > Takes filters the same way as filterimport.\n\n"
+            f"**{botprefix}filterlists [global|guild|channel] [page]** - Lists the filters, sorted, a page at a time.\n"
+            f"  > Example: `{botprefix}filterlists 2`\n\n"
+            f"**{botprefix}filtersearch [global|guild|channel] <text>** - Finds filters containing the text.\n"
+            f"  > Example: `{botprefix}filtersearch bmw*` finds filters starting with 'BMW'.\n\n"
+            f"**{botprefix}filterexport [global|guild|channel]** - Uploads the filters as a text file.\n"
+            "  > The file can be imported again with filterimport.\n\n"
             f"**{botprefix}clearfilters** - Clears all filters from the global list after confirmation.\n"
             f"  > Example: `{botprefix}clearfilters`\n"
-            "  > Prompts a confirmation dialog to clear all filters."
+            "  > Prompts a confirmation dialog to clear all filters.\n\n"
+            f"**{botprefix}reloadconfig** - Applies changes to the configuration file now.\n"
+            "  > The file is also checked for changes every few seconds.\n\n"
+            f"**{botprefix}stats** - Shows message, match and webhook statistics.\n"
+            f"  > Example: `{botprefix}stats`\n"
+            "  > Shows the hottest filters and how long matching and webhooks take.\n\n"
+            f"**{botprefix}profile [seconds]** - Profiles the bot for a while and uploads the report."
         )
 
-        await ctx.send(help_message)
+        await self._send_chunked(ctx, help_message)
 
     @commands.command(aliases=['addfilter'])
     async def filteradd(self, ctx: Context, *, filter_word: str) -> None:
@@ -58,20 +102,19 @@ class FilterCommands(commands.Cog):
         :param ctx: The command context.
         :param filter_word: The word to add to the filter list.
         """
-        filters = load_filters()  
-        normalized_filter = filter_word.upper()
-
-        if normalized_filter not in filters:
-            filters.append(normalized_filter)
-            save_filters(filters)
+        normalized_filter = await self._validate(ctx, filter_word)
+        if normalized_filter is None:
+            return
 
+        description = describe_filter(parse_filter(normalized_filter))
+        if self.filters.add(normalized_filter):
             await ctx.send(
-                f"{ctx.author.mention}: Now listening to anything that includes '{normalized_filter}'.\n"
-                f"Current total filters: {len(filters)}"
+                f"{ctx.author.mention}: Now listening to anything {description}.\n"
+                f"Current total filters: {len(self.filters)}"
             )
         else:
             await ctx.send(
-                f"{ctx.author.mention}: I am **already** listening to anything that includes '{normalized_filter}'."
+                f"{ctx.author.mention}: I am **already** listening to anything {description}."
             )
 
     @commands.command(aliases=['removefilter'])
@@ -82,39 +125,309 @@ class FilterCommands(commands.Cog):
         :param ctx: The command context.
         :param filter_word: The word to remove from the filter list.
         """
-        filters = load_filters()
-        normalized_filter = filter_word.upper()
-
-        if normalized_filter in filters:
-            filters.remove(normalized_filter)
-            save_filters(filters)
+        normalized_filter = normalize_filter(filter_word)
 
+        if self.filters.remove(normalized_filter):
             await ctx.send(
                 f"{ctx.author.mention}: Filter '{filter_word}' has been successfully removed from the list.\n"
-                f"Current total filters: {len(filters)}"
+                f"Current total filters: {len(self.filters)}"
             )
         else:
             await ctx.send(
                 f"{ctx.author.mention}: Filter '{filter_word}' does not exist in the list."
             )
 
-    @commands.command(aliases=['listfilters', 'listfilter', 'filterlist'])
-    async def filterlists(self, ctx: Context) -> None:
+    @staticmethod
+    async def _validate(ctx: Context, filter_word: str) -> Optional[str]:
+        """
+        Normalizes a filter and checks that it compiles, telling the user if it doesn't.
+
+        :param ctx: The command context.
+        :param filter_word: The filter as entered.
+        :return: The filter to store, or `None` if it is invalid.
+        """
+        normalized_filter = normalize_filter(filter_word)
+        try:
+            parse_filter(normalized_filter)
+        except FilterSyntaxError as e:
+            await ctx.send(f"{ctx.author.mention}: Invalid filter '{filter_word}': {e}")
+            return None
+        return normalized_filter
+
+    @staticmethod
+    def _scope(ctx: Context, scope_name: Optional[str]) -> FilterScope:
+        """
+        Resolves a scope name to the scope of the invoking guild or channel.
+
+        :param ctx: The command context.
+        :param scope_name: 'global', 'guild' or 'channel'. `None` means global.
+        :return: The filter scope.
+        """
+        guild_id = ctx.guild.id if ctx.guild else 0
+
+        if scope_name == 'guild':
+            if not guild_id:
+                raise commands.BadArgument("Guild filters can only be managed from inside a server.")
+            return FilterScope(guild_id, 0)
+        if scope_name == 'channel':
+            return FilterScope(guild_id, ctx.channel.id)
+        return GLOBAL_SCOPE
+
+    @commands.command(aliases=['addscoped'])
+    async def scopedadd(self, ctx: Context, scope_name: Literal['guild', 'channel'], *, filter_word: str) -> None:
         """
-        Lists all currently active filters in the global filter list.
+        Adds a filter that only applies to messages in this guild or channel.
 
         :param ctx: The command context.
+        :param scope_name: 'guild' or 'channel'.
+        :param filter_word: The word to add to the filter list.
         """
-        filters = load_filters()
-        if filters:
-            filters_list = '\n'.join([f"- {filter_word}" for filter_word in filters])
+        scope = self._scope(ctx, scope_name)
+        normalized_filter = await self._validate(ctx, filter_word)
+        if normalized_filter is None:
+            return
 
+        description = describe_filter(parse_filter(normalized_filter))
+        if self.filters.add(normalized_filter, scope):
             await ctx.send(
-                f"Here are the current filters being monitored:\n{filters_list}\n"
-                f"Total Filters: {len(filters)}"
+                f"{ctx.author.mention}: Now listening to anything in this {scope_name} {description}.\n"
+                f"Current {scope_name} filters: {self.filters.count(scope)}"
             )
         else:
+            await ctx.send(
+                f"{ctx.author.mention}: I am **already** listening to anything in this {scope_name} {description}."
+            )
+
+    @commands.command(aliases=['removescoped'])
+    async def scopedremove(self, ctx: Context, scope_name: Literal['guild', 'channel'], *, filter_word: str) -> None:
+        """
+        Removes a filter from this guild's or channel's filter list.
+
+        :param ctx: The command context.
+        :param scope_name: 'guild' or 'channel'.
+        :param filter_word: The word to remove from the filter list.
+        """
+        scope = self._scope(ctx, scope_name)
+
+        if self.filters.remove(normalize_filter(filter_word), scope):
+            await ctx.send(
+                f"{ctx.author.mention}: Filter '{filter_word}' has been successfully removed from this {scope_name}'s list.\n"
+                f"Current {scope_name} filters: {self.filters.count(scope)}"
+            )
+        else:
+            await ctx.send(
+                f"{ctx.author.mention}: Filter '{filter_word}' does not exist in this {scope_name}'s list."
+            )
+
+    @commands.command(aliases=['importfilters', 'filterbulkadd', 'addfilters'])
+    async def filterimport(
+        self,
+        ctx: Context,
+        scope_name: Optional[Literal['global', 'guild', 'channel']] = None,
+        *,
+        filters: str = ''
+    ) -> None:
+        """
+        Bulk imports filters from text attachments and/or the message itself, in a single change.
+        Filters are separated by new lines or commas.
+
+        :param ctx: The command context.
+        :param scope_name: 'global' (default), 'guild' or 'channel'.
+        :param filters: Filters given inline.
+        """
+        scope = self._scope(ctx, scope_name)
+
+        terms: List[str] = []
+        invalid: List[str] = []
+        for term in await self._read_filters(ctx, filters):
+            try:
+                parse_filter(term)
+            except FilterSyntaxError:
+                invalid.append(term)
+            else:
+                terms.append(term)
+
+        if invalid:
+            await ctx.send(
+                f"{ctx.author.mention}: Skipped `{len(invalid)}` invalid filter(s), e.g. `{invalid[0]}`."
+            )
+
+        if not terms:
+            await ctx.send(f"{ctx.author.mention}: No filters found. Attach a text file or list filters after the command.")
+            return
+
+        added = self.filters.add_many(terms, scope)
+        await ctx.send(
+            f"{ctx.author.mention}: Imported `{added}` new filter(s) into the {scope_name or 'global'} list "
+            f"(`{len(terms) - added}` already present).\n"
+            f"Current {scope_name or 'global'} filters: {self.filters.count(scope)}"
+        )
+
+    @staticmethod
+    async def _read_filters(ctx: Context, filters: str) -> List[str]:
+        """
+        Collects the filters given inline and in text attachments, one per line or separated by commas.
+
+        :param ctx: The command context.
+        :param filters: Filters given inline.
+        :return: The normalized filters.
+        """
+        chunks: List[str] = [filters]
+        for attachment in ctx.message.attachments:
+            data = await attachment.read()
+            chunks.append(data.decode('utf-8', errors='replace'))
+
+        return [normalize_filter(term) for chunk in chunks for term in split_filters(chunk)]
+
+    @commands.command(aliases=['removefilters', 'filtersremove'])
+    async def filterbulkremove(
+        self,
+        ctx: Context,
+        scope_name: Optional[Literal['global', 'guild', 'channel']] = None,
+        *,
+        filters: str = ''
+    ) -> None:
+        """
+        Bulk removes filters given in text attachments and/or the message itself, in a single change.
+
+        :param ctx: The command context.
+        :param scope_name: 'global' (default), 'guild' or 'channel'.
+        :param filters: Filters given inline.
+        """
+        scope = self._scope(ctx, scope_name)
+
+        terms = await self._read_filters(ctx, filters)
+        if not terms:
+            await ctx.send(f"{ctx.author.mention}: No filters found. Attach a text file or list filters after the command.")
+            return
+
+        removed = self.filters.remove_many(terms, scope)
+        await ctx.send(
+            f"{ctx.author.mention}: Removed `{removed}` filter(s) from the {scope_name or 'global'} list "
+            f"(`{len(set(terms)) - removed}` not found).\n"
+            f"Current {scope_name or 'global'} filters: {self.filters.count(scope)}"
+        )
+
+    @staticmethod
+    def _shortened(text: str) -> str:
+        """
+        :return: The text, cut to `MAX_LISTED_LENGTH` characters if it is longer.
+        """
+        if len(text) > MAX_LISTED_LENGTH:
+            text = text[:MAX_LISTED_LENGTH - 3] + '...'
+        return text
+
+    @classmethod
+    def _listed(cls, filter_word: str) -> str:
+        """
+        :return: A listing line for the filter, shortened if it is very long.
+        """
+        return f"- {cls._shortened(filter_word)}"
+
+    @staticmethod
+    async def _send_chunked(ctx: Context, text: str) -> None:
+        """
+        Sends text as several messages if it is over Discord's length limit, splitting between lines.
+
+        :param ctx: The command context.
+        :param text: The text to send.
+        """
+        chunk: List[str] = []
+        length = 0
+        for line in text.split('\n'):
+            if chunk and length + len(line) + 1 > MESSAGE_LIMIT:
+                await ctx.send('\n'.join(chunk))
+                chunk, length = [], 0
+            chunk.append(line[:MESSAGE_LIMIT])
+            length += len(line) + 1
+        if chunk:
+            await ctx.send('\n'.join(chunk))
+
+    @commands.command(aliases=['listfilters', 'listfilter', 'filterlist'])
+    async def filterlists(
+        self,
+        ctx: Context,
+        scope_name: Optional[Literal['global', 'guild', 'channel']] = None,
+        page: int = 1
+    ) -> None:
+        """
+        Lists the filters of a scope in sorted order, one page at a time.
+
+        :param ctx: The command context.
+        :param scope_name: 'global' (default), 'guild' or 'channel'.
+        :param page: The page to show, starting at 1.
+        """
+        scope = self._scope(ctx, scope_name)
+        index = self.filters.sorted_filters(scope)
+        if not index:
             await ctx.send("No filters set.")
+            return
+
+        pages = (len(index) + PAGE_SIZE - 1) // PAGE_SIZE
+        page = min(max(page, 1), pages)
+        start = (page - 1) * PAGE_SIZE
+        filters_list = '\n'.join(self._listed(filter_word) for filter_word in index[start:start + PAGE_SIZE])
+
+        footer = f"Total Filters: {len(index)}"
+        if pages > 1:
+            footer += (
+                f" | Page {page}/{pages}. Use `{ctx.prefix}filterlists {scope_name or 'global'} <page>` for other pages, "
+                f"or `{ctx.prefix}filterexport` for a file."
+            )
+
+        await ctx.send(f"Here are the current filters being monitored:\n{filters_list}\n{footer}")
+
+    @commands.command(aliases=['searchfilters', 'filterfind'])
+    async def filtersearch(
+        self,
+        ctx: Context,
+        scope_name: Optional[Literal['global', 'guild', 'channel']] = None,
+        *,
+        query: str
+    ) -> None:
+        """
+        Finds filters containing some text, or starting with it if the text ends with '*'.
+
+        :param ctx: The command context.
+        :param scope_name: 'global' (default), 'guild' or 'channel'.
+        :param query: The text to look for.
+        """
+        scope = self._scope(ctx, scope_name)
+
+        prefix = query.endswith('*')
+        text = normalize_filter(query.rstrip('*') if prefix else query)
+        found = self.filters.search(text, scope, prefix=prefix)
+        if not found:
+            await ctx.send(f"{ctx.author.mention}: No filters {'start with' if prefix else 'contain'} '{self._shortened(text)}'.")
+            return
+
+        filters_list = '\n'.join(self._listed(filter_word) for filter_word in found[:PAGE_SIZE])
+        more = f"\n...and `{len(found) - PAGE_SIZE}` more." if len(found) > PAGE_SIZE else ""
+        await self._send_chunked(
+            ctx,
+            f"{ctx.author.mention}: `{len(found)}` filter(s) {'start with' if prefix else 'contain'} '{self._shortened(text)}':\n"
+            f"{filters_list}{more}"
+        )
+
+    @commands.command(aliases=['exportfilters'])
+    async def filterexport(self, ctx: Context, scope_name: Optional[Literal['global', 'guild', 'channel']] = None) -> None:
+        """
+        Uploads the filters of a scope as a text file, one filter per line, in sorted order.
+
+        :param ctx: The command context.
+        :param scope_name: 'global' (default), 'guild' or 'channel'.
+        """
+        scope = self._scope(ctx, scope_name)
+        index = self.filters.sorted_filters(scope)
+        if not index:
+            await ctx.send("No filters set.")
+            return
+
+        data = io.BytesIO('\n'.join(index).encode('utf-8'))
+        await ctx.send(
+            f"{ctx.author.mention}: `{len(index)}` {scope_name or 'global'} filter(s).",
+            file=File(data, filename=f"filters-{scope_name or 'global'}.txt")
+        )
 
     @commands.command(aliases=['filtersclear'])
     async def clearfilters(self, ctx: Context) -> None:
@@ -123,14 +436,12 @@ class FilterCommands(commands.Cog):
 
         :param ctx: The command context.
         """
-        filters = load_filters()
-
-        if not filters:
+        if not self.filters:
             await ctx.send(f"{ctx.author.mention}: There are no filters to clear.")
             return
 
         await ctx.send(
-            f"{ctx.author.mention}: Are you sure you want to clear `{len(filters)}` filters from the list? "
+            f"{ctx.author.mention}: Are you sure you want to clear `{len(self.filters)}` filters from the list? "
             "Reply with 'Yes' to confirm or 'No' to cancel."
         )
 
@@ -141,16 +452,89 @@ class FilterCommands(commands.Cog):
             msg = await self.bot.wait_for('message', check=check, timeout=30.0)
 
             if msg.content.lower() == "yes":
-                amt = len(filters)
-                filters.clear()
-                save_filters(filters)
+                amt = self.filters.clear()
 
                 await ctx.send(f"{ctx.author.mention}: Successfully cleared `{amt}` filters from the list.")
             else:
-                await ctx.send(f"{ctx.author.mention}: Cancelled clearance of `{len(filters)}` filters.")
+                await ctx.send(f"{ctx.author.mention}: Cancelled clearance of `{len(self.filters)}` filters.")
         except asyncio.TimeoutError:
             await ctx.send(f"{ctx.author.mention}: Timed out. No filters were cleared.")
 
+    @commands.command(aliases=['filterstats'])
+    async def stats(self, ctx: Context) -> None:
+        """
+        Shows runtime statistics: pipeline counters, hottest filters, match and webhook
+        latency, and filter reloads.
+
+        :param ctx: The command context.
+        """
+        def read(name: str) -> Dict[str, float]:
+            metric = registry.get(name)
+            return {labels[0] if labels else '': value for labels, value in metric.items()} if metric else {}
+
+        events = read('moneypenny_pipeline_events')
+        dedup = read('moneypenny_dedup_cache')
+        queue_depth = sum(read('moneypenny_webhook_queue_depth').values())
+        ingest_depth = read('moneypenny_ingest_queue_depth').get('', 0)
+        ingest_dropped = int(sum(read('moneypenny_ingest_dropped').values()))
+        responses = {status: int(count) for (status,), count in WEBHOOK_RESPONSES.items()}
+
+        dropped = ', '.join(
+            f"{event.split('.', 1)[1]}: {int(count)}"
+            for event, count in sorted(events.items())
+            if event.startswith('prefilter.') and event != 'prefilter.passed'
+        )
+        lookups = dedup.get('hits', 0) + dedup.get('misses', 0)
+        hit_rate = dedup.get('hits', 0) / lookups * 100 if lookups else 0.0
+
+        worst = slow_callbacks.worst()
+        worst_line = f" | worst recent `{worst.seconds * 1000:.0f} ms` in {self._shortened(worst.callback)}" if worst else ""
+
+        hot_filters = sorted(FILTER_MATCHES.items(), key=lambda item: item[1], reverse=True)[:10]
+        hot_list = '\n'.join(f"{self._listed(labels[0])}: {int(count)}" for labels, count in hot_filters) or "- None yet"
+
+        await self._send_chunked(
+            ctx,
+            "**Stats**\n"
+            f"Messages seen: `{int(events.get('received', 0))}` | "
+            f"Embeds inspected: `{int(events.get('embeds', 0))}` | "
+            f"Matches: `{int(events.get('match.matched', 0))}`\n"
+            f"Dropped by pre-filter: {dropped or 'none'}\n"
+            f"Duplicates skipped: `{int(events.get('match.duplicate', 0) + events.get('alert.duplicate', 0))}` "
+            f"(cache hit rate {hit_rate:.1f}%)\n"
+            f"Ingest: queue `{int(ingest_depth)}` | dropped `{ingest_dropped}`\n"
+            f"Match latency: avg `{MATCH_SECONDS.mean() * 1000:.3f} ms` | p99 <= `{MATCH_SECONDS.quantile(0.99) * 1000:g} ms`\n"
+            f"Webhook: queue `{int(queue_depth)}` | avg `{WEBHOOK_SECONDS.mean() * 1000:.0f} ms` | "
+            f"429s `{responses.get('429', 0)}` | dropped `{int(events.get('alert.dropped', 0))}`\n"
+            f"Loop: slow callbacks `{int(SLOW_CALLBACKS.value())}`{worst_line}\n"
+            f"Filter reloads: disk `{int(FILTER_RELOADS.value('disk'))}` | command `{int(FILTER_RELOADS.value('command'))}`\n"
+            f"Hot filters ({len(self.filters)} loaded):\n{hot_list}"
+        )
+
+    @commands.command(aliases=['profileloop'])
+    async def profile(self, ctx: Context, seconds: float = 30) -> None:
+        """
+        Profiles the event loop with cProfile for a while, then writes the report to
+        'profile_dir' and uploads it.
+
+        :param ctx: The command context.
+        :param seconds: How long to profile for, up to 5 minutes.
+        """
+        seconds = min(max(seconds, 1), MAX_PROFILE_SECONDS)
+        await ctx.send(f"{ctx.author.mention}: Profiling for {seconds:g}s...")
+
+        try:
+            path = await self.profiler.profile(seconds, profile_directory())
+        except (RuntimeError, ValueError) as e:
+            await ctx.send(f"{ctx.author.mention}: Could not profile: {e}")
+            return
+
+        logger.info(f"Wrote profile report to {path}")
+        await ctx.send(
+            f"{ctx.author.mention}: Profile report written to `{path}`.",
+            file=File(path, filename=os.path.basename(path))
+        )
+
 async def setup(bot: commands.Bot) -> None:
     """
     Asynchronous function to set up the FilterCommands cog.
@@ -0,0 +1,76 @@
+# System imports
+from typing import TYPE_CHECKING, Optional
+
+# Third-party imports
+from discord.ext import commands
+
+# Project-specific imports
+from src.configuration.config import config
+from src.utilities.metrics import registry
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+# Logger
+from src.configuration.debug import setup_logging
+logger = setup_logging()
+
+class Metrics(commands.Cog):
+    def __init__(self, bot: commands.Bot) -> None:
+        """
+        Initializes the Metrics cog, which serves the bot's metrics over a local HTTP
+        endpoint in the Prometheus text format.
+
+        :param bot: The Discord bot instance.
+        """
+        self.bot = bot
+        self.runner: Optional['web.AppRunner'] = None
+
+    async def cog_load(self) -> None:
+        """
+        Starts the metrics endpoint if 'metrics_port' is set in the configuration.
+        """
+        port = config.get('metrics_port')
+        if not port:
+            return
+
+        host = config.get('metrics_host', '127.0.0.1')
+
+        # The aiohttp server is only imported when the endpoint is enabled
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get('/metrics', self.handle_metrics)
+
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, host, port).start()
+
+        logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+
+    async def cog_unload(self) -> None:
+        """
+        Stops the metrics endpoint.
+        """
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def handle_metrics(self, request: 'web.Request') -> 'web.Response':
+        """
+        Renders every registered metric.
+
+        :param request: The HTTP request.
+        :return: The metrics in the Prometheus text exposition format.
+        """
+        from aiohttp import web
+
+        return web.Response(text=registry.render(), content_type='text/plain', charset='utf-8')
+
+async def setup(bot: commands.Bot) -> None:
+    """
+    Asynchronous function to set up the Metrics cog.
+
+    :param bot: The Discord bot instance.
+    """
+    await bot.add_cog(Metrics(bot))
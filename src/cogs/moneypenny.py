@@ -1,127 +1,433 @@
 # System imports
-from datetime import datetime
-from typing import Optional
+import time
+from collections import Counter
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 
 # Third-party imports
 import discord
-from discord.ext import commands
-import aiohttp  # Needed for sending webhook requests
+from discord.ext import commands, tasks
 
 # Project-specific imports
-from src.configuration.config import config 
-from src.cogs.data.load_filters import load_filters
+from src.configuration.config import Config, config, resolve_path
+from src.cogs.data.backends import FilterScope
+from src.cogs.data.filter_store import filter_store
+from src.cogs.data.fields import EmbedRecord, extract_record
+from src.cogs.data.match_pool import MatchPool
+from src.cogs.data.matcher import Match
+from src.cogs.data.syntax import normalize_filter
+from src.utilities.alerts import AlertRenderer
+from src.utilities.cache import TTLCache
+from src.utilities.capture import CaptureWriter, capture_entry
+from src.utilities.ingest import IngestQueue
+from src.utilities.metrics import FILTER_MATCHES, MATCH_SECONDS, CallbackCounter, Gauge, registry
+from src.utilities.routing import AlertRouter, parse_routes
+from src.utilities.webhook import WebhookDispatcher
 
 # Logger
 from src.configuration.debug import setup_logging
 logger = setup_logging()
 
+# A queued (message, embed) pair, plus the record, listing fingerprint and match if it was triaged
+Candidate = Tuple[Any, ...]
+
+def listing_fingerprint(title: Optional[str], address: Optional[str]) -> Tuple[str, str]:
+    """
+    Normalizes the identifying parts of a listing so re-posts and edits of the same
+    listing (differing only in case or whitespace) produce the same key.
+
+    :param title: The embed title.
+    :param address: The value of the embed's address field, if any.
+    :return: The normalized (title, address) pair.
+    """
+    return (
+        ' '.join((title or '').lower().split()),
+        ' '.join((address or '').lower().split())
+    )
+
 class MoneyPenny(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
-        self.webhook_url = config['webhook_url']
+        self.filters = filter_store
+
+        # Alerts go to the default webhook and any webhooks their filter is routed to
+        self.router = AlertRouter(config['webhook_url'], self._create_dispatcher)
+
+        # Alert format, compiled from the configured template; the bot's name and avatar are set once ready
+        self.renderer = AlertRenderer(config.get('alert_template'))
+        self.renderer.set_identity(bot.user)
+
+        # Large filter sets are matched in a thread or process pool instead of on the event loop
+        self.match_pool = MatchPool(
+            mode=config.get('match_executor', 'inline'),
+            workers=config.get('match_workers'),
+            threshold=config.get('match_offload_threshold', 5000)
+        )
+
+        # Pre-filtered embeds wait here for a fixed number of workers, bounding memory during bursts
+        self.ingest = IngestQueue(
+            self._handle_candidate,
+            max_queue=config.get('ingest_queue_size', 1000),
+            workers=config.get('ingest_workers', 2),
+            overflow=config.get('ingest_overflow', 'drop_oldest'),
+            triage=self._triage
+        )
+
+        # Optionally record every inspected embed, for replaying against other filters later
+        capture_file = config.get('capture_file')
+        self.capture: Optional[CaptureWriter] = CaptureWriter(
+            resolve_path(capture_file),
+            max_bytes=config.get('capture_max_bytes', 50 * 1024 * 1024),
+            backups=config.get('capture_backups', 5)
+        ) if capture_file else None
+
+        # Recently inspected listings and sent alerts, used to suppress duplicates
+        self.seen_alerts = TTLCache(
+            maxsize=config.get('dedup_cache_size', 4096),
+            ttl=config.get('dedup_ttl', 900)
+        )
+
+        # Only watch these channels/guilds if set; empty sets watch everything
+        self.channel_allowlist: FrozenSet[int] = frozenset()
+        self.guild_allowlist: FrozenSet[int] = frozenset()
+
+        # Tuning knobs follow the configuration file without a restart
+        self._apply_config(config.snapshot)
+        config.subscribe(self._apply_config)
+
+        # Messages/embeds passed or dropped by each stage of on_message
+        self.stage_counts: Counter = Counter()
+        self._register_metrics()
+
+    @staticmethod
+    def _create_dispatcher(url: str) -> WebhookDispatcher:
+        """
+        Creates the sender for one webhook destination.
+
+        :param url: The webhook URL.
+        :return: The dispatcher, configured from the current settings.
+        """
+        return WebhookDispatcher(
+            url,
+            max_queue=config.get('webhook_queue_size', 1000),
+            workers=config.get('webhook_workers', 1),
+            max_retries=config.get('webhook_max_retries', 3),
+            batching=config.get('alert_batching', False),
+            batch_window=config.get('alert_batch_window', 0.25),
+            batch_max_wait=config.get('alert_batch_max_wait', 1.0)
+        )
+
+    def _apply_config(self, snapshot: Config) -> None:
+        """
+        Applies the settings that can change while the bot runs. Queue sizes, the
+        capture file and the webhook worker count only take effect on a restart.
+
+        :param snapshot: The current configuration.
+        """
+        self.router.configure(
+            snapshot['webhook_url'],
+            parse_routes(snapshot.get('webhook_routes', ()), snapshot.get('filter_groups', {}))
+        )
+        for dispatcher in self.router.dispatchers.values():
+            dispatcher.max_retries = snapshot.get('webhook_max_retries', 3)
+            dispatcher.batching = snapshot.get('alert_batching', False)
+            dispatcher.batch_window = snapshot.get('alert_batch_window', 0.25)
+            dispatcher.batch_max_wait = snapshot.get('alert_batch_max_wait', 1.0)
+
+        self.match_pool.configure(
+            mode=snapshot.get('match_executor', 'inline'),
+            workers=snapshot.get('match_workers'),
+            threshold=snapshot.get('match_offload_threshold', 5000)
+        )
+        self.ingest.configure(
+            workers=snapshot.get('ingest_workers', 2),
+            overflow=snapshot.get('ingest_overflow', 'drop_oldest')
+        )
+
+        self.seen_alerts.maxsize = snapshot.get('dedup_cache_size', 4096)
+        self.seen_alerts.ttl = snapshot.get('dedup_ttl', 900)
+        self.watch_filters.change_interval(seconds=snapshot.get('filters_reload_interval', 5))
+
+        self.renderer.configure(snapshot.get('alert_template'))
+
+        self.channel_allowlist = frozenset(int(channel_id) for channel_id in snapshot.get('channel_allowlist', ()))
+        self.guild_allowlist = frozenset(int(guild_id) for guild_id in snapshot.get('guild_allowlist', ()))
+
+    def _register_metrics(self) -> None:
+        """
+        Exposes the cog's own counters through the shared metrics registry. They are
+        only read when metrics are rendered, so the hot path keeps updating plain dicts.
+        """
+        registry.register(CallbackCounter(
+            'moneypenny_pipeline_events',
+            'Messages and embeds passed or dropped by each on_message stage.',
+            ['event'],
+            lambda: {(event,): count for event, count in self.stage_counts.items()}
+        ))
+
+        dedup_gauge = registry.register(Gauge('moneypenny_dedup_cache', 'Duplicate-alert cache size and counters.', ['stat']))
+        dedup_gauge.set_function(lambda: {(stat,): value for stat, value in self.seen_alerts.stats().items()})
+
+        queue_gauge = registry.register(Gauge('moneypenny_webhook_queue_depth', 'Alerts waiting to be sent, per destination.', ['destination']))
+        queue_gauge.set_function(lambda: {(name,): depth for name, depth in self.router.queue_depths().items()})
+
+        ingest_gauge = registry.register(Gauge('moneypenny_ingest_queue_depth', 'Embeds waiting to be matched.'))
+        ingest_gauge.set_function(lambda: {(): self.ingest.queue.qsize()})
+
+        registry.register(CallbackCounter(
+            'moneypenny_ingest_dropped',
+            'Embeds dropped because the ingest queue was full.',
+            ['reason'],
+            lambda: {(reason,): count for reason, count in self.ingest.dropped.items()}
+        ))
+
+    async def cog_load(self) -> None:
+        """
+        Starts watching the filters file for external changes and starts the webhook
+        sender on the bot's shared aiohttp session when the cog is loaded.
+        """
+        self.watch_filters.start()
+        await self.router.start(getattr(self.bot, 'session', None))
+        self.ingest.start()
+
+    async def cog_unload(self) -> None:
+        """
+        Stops watching the filters file and flushes pending alerts when the cog is unloaded.
+        """
+        config.unsubscribe(self._apply_config)
+        self.watch_filters.cancel()
+        await self.ingest.close()
+        self.match_pool.close()
+        await self.router.close()
+        if self.capture is not None:
+            self.capture.close()
+
+    @tasks.loop(seconds=5)
+    async def watch_filters(self) -> None:
+        """
+        Periodically checks whether the filters file was edited outside of the bot,
+        so the message handler itself never touches the disk.
+        """
+        if self.filters.reload():
+            logger.info(f"Reloaded {len(self.filters)} filters from disk (version {self.filters.version}).")
+
+    @commands.Cog.listener()
+    async def on_ready(self) -> None:
+        """
+        Reads the name and avatar alerts are posted with, once the bot's user is known.
+        """
+        self.renderer.set_identity(self.bot.user)
+
+    @commands.Cog.listener()
+    async def on_user_update(self, before: discord.User, after: discord.User) -> None:
+        """
+        Refreshes the name and avatar alerts are posted with when the bot's profile changes.
+        """
+        if self.bot.user is not None and after.id == self.bot.user.id:
+            self.renderer.set_identity(after)
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message) -> None:
         """
-        Listener for incoming messages. It processes messages and checks if they contain 
-        specific filters. If a match is found, it sends a webhook notification.
+        Listener for incoming messages. Each message goes through three stages:
+
+        1. Pre-filter: cheap checks on the author, webhook, channel/guild and embed author
+           that drop almost all traffic before any formatting or matching happens.
+        2. Match: every remaining Moneypenny embed is queued for the ingest workers, which
+           de-duplicate it and match it against the filters.
+        3. Alert: matches are rendered into an alert embed and queued for the webhook.
+
+        `stage_counts` records how many messages/embeds each stage lets through or drops.
         """
-        # Skip the bot's own messages and command messages
-        if message.author.id == self.bot.user.id or message.content.startswith('.'):
+        self.stage_counts['received'] += 1
+
+        embeds = self._prefilter(message)
+        if not embeds:
             return
 
-        # Log to check if any message is detected (debugging)
-        logger.info(f"Received message from: {message.author} (webhook_id: {message.webhook_id})")
+        for embed in embeds:
+            await self.ingest.put((message, embed))
+
+    async def _handle_candidate(self, candidate: Candidate) -> None:
+        """
+        Ingest worker callback: inspects a queued (message, embed) pair, reusing the
+        match found by `_triage` if the pair went through it.
+        """
+        await self._inspect(*candidate)
+
+    async def _triage(self, candidate: Candidate) -> Optional[Candidate]:
+        """
+        Decides whether a candidate is worth keeping when the ingest queue is full.
+        Duplicates are dropped before any matching, and the match found for a kept
+        candidate is queued with it, so it isn't matched a second time.
+
+        :param candidate: The (message, embed) pair.
+        :return: The candidate with its match, or `None` if it is a duplicate or matches no filter.
+        """
+        message, embed = candidate
+        inspected = self._deduplicate(message, embed)
+        if inspected is None:
+            return None
+
+        record, listing, scopes = inspected
+        match = await self._match(record, scopes)
+        if match is None:
+            return None
+        return message, embed, (record, listing, match)
+
+    def _prefilter(self, message: discord.Message) -> List[discord.Embed]:
+        """
+        Stage 1: returns the Moneypenny embeds of the message, or an empty list if the
+        message can be ignored. Only attribute lookups happen here.
+
+        :param message: The incoming message.
+        :return: The embeds to inspect.
+        """
+        counts = self.stage_counts
 
         # Detect webhook messages by checking webhook_id or if author is a bot without a discriminator (webhook)
-        if message.webhook_id or (message.author.bot and message.author.discriminator == "0000"):
-            logger.info(f"Webhook or bot message detected: {message.content}")
-
-            # Check if the message contains embeds
-            for embed in message.embeds:
-                if embed.author and embed.author.name == "Moneypenny":
-                    filters = load_filters()  # Load the latest filters
-                    
-                    # Normalize filters to uppercase for case-insensitive matching
-                    normalized_filters = [filter_word.upper() for filter_word in filters]
-
-                    for filter_word in normalized_filters:
-                        logger.debug(f"Checking filter '{filter_word}' in embed title(s)")
-
-                        # Case-insensitive search for the filter word in the title
-                        if embed.title and filter_word.lower() in embed.title.lower():
-                            logger.info(f"Filter '{filter_word}' matched in embed title: {embed.title}")
-
-                            # Find the start and end index of the filter word in the title (case-insensitive)
-                            start_index = embed.title.lower().find(filter_word.lower())
-                            end_index = start_index + len(filter_word)
-
-                            # Bold the part of the title where the filter was found, preserving case
-                            bolded_title = f"{embed.title[:start_index]}**{embed.title[start_index:end_index]}**{embed.title[end_index:]}"
-
-                            # Initialize address field
-                            address_value: Optional[str] = None
-
-                            # Check for a field named "Address" or "Address:", case-insensitive
-                            for field in embed.fields:
-                                if field.name.lower() in ["address", "address:"]:
-                                    address_value = field.value
-                                    logger.info(f"Address found: {address_value}")
-                                    break
-
-                            # Prepare and send the alert with the clickable "Jump to Message" link
-                            jump_url = message.jump_url
-                            embed_alert = discord.Embed(
-                                title=f"Filter **{filter_word.upper()}** found in message!",
-                                description="**Details**: Filter matched in the title.",
-                                color=0x7F868C,
-                                timestamp=datetime.now()
-                            )
-
-                            embed_alert.add_field(
-                                name="**Original Message Title**",
-                                value=bolded_title if bolded_title else "No title",
-                                inline=False
-                            )
-
-                            # Add the address field if it was found
-                            if address_value:
-                                embed_alert.add_field(
-                                    name="**Address**",
-                                    value=address_value,
-                                    inline=False
-                                )
-
-                            embed_alert.add_field(
-                                name="**Jump to Message**",
-                                value=f"[Click here to view the message]({jump_url})",
-                                inline=False
-                            )
-
-                            await self.send_webhook(embed_alert)
-                            logger.info(f"Filter '{filter_word}' matched and alert sent.")
-                            break
-                        
-        await self.bot.process_commands(message)
-
-    async def send_webhook(self, embed: discord.Embed) -> None:
-        """
-        Sends a webhook notification with the embed if any filters are found in the message.
-        """
-        async with aiohttp.ClientSession() as session:
-            webhook = discord.Webhook.from_url(self.webhook_url, session=session)
-
-            # Get the bot's username and avatar
-            bot_username = self.bot.user.display_name  # Self-bot's display name
-            bot_avatar_url = self.bot.user.avatar.url  # Self-bot's avatar URL
-
-            # Send the @everyone mention along with the embed
-            await webhook.send(
-                content="@everyone",
-                embed=embed, 
-                username=bot_username, 
-                avatar_url=bot_avatar_url
-            )
+        author = message.author
+        if not (message.webhook_id or (author.bot and author.discriminator == "0000")):
+            counts['prefilter.not_webhook'] += 1
+            return []
+
+        # Skip the bot's own messages and command messages
+        if author.id == self.bot.user.id or message.content.startswith(config['prefix']):
+            counts['prefilter.own_or_command'] += 1
+            return []
+
+        # Optional allowlists; empty means every channel/guild is watched
+        if self.channel_allowlist and message.channel.id not in self.channel_allowlist:
+            counts['prefilter.channel'] += 1
+            return []
+        if self.guild_allowlist and (message.guild is None or message.guild.id not in self.guild_allowlist):
+            counts['prefilter.guild'] += 1
+            return []
+
+        embeds = [embed for embed in message.embeds if embed.author and embed.author.name == "Moneypenny"]
+        if not embeds:
+            counts['prefilter.no_embed'] += 1
+            return []
+
+        counts['prefilter.passed'] += 1
+        counts['embeds'] += len(embeds)
+        logger.debug("Webhook message %s in channel %s has %d Moneypenny embed(s)", message.id, message.channel.id, len(embeds))
+        return embeds
+
+    async def _inspect(
+        self,
+        message: discord.Message,
+        embed: discord.Embed,
+        triaged: Optional[Tuple[EmbedRecord, Tuple[str, str], Match]] = None
+    ) -> None:
+        """
+        Stage 2: de-duplicates and matches a single Moneypenny embed, handing matches to the alert stage.
+
+        :param message: The message containing the embed.
+        :param embed: The Moneypenny embed.
+        :param triaged: The record, listing fingerprint and match `_triage` already found, if any.
+        """
+        if triaged is None:
+            inspected = self._deduplicate(message, embed)
+            if inspected is None:
+                return
+
+            record, listing, scopes = inspected
+            match = await self._match(record, scopes)
+            if match is None:
+                return
+        else:
+            record, listing, match = triaged
+
+        counts = self.stage_counts
+        counts['match.matched'] += 1
+        filter_word = normalize_filter(match.filter)
+        FILTER_MATCHES.inc(filter_word)
+        logger.info("Filter '%s' matched in embed %s: %s", filter_word, match.field, embed.title)
+
+        # Don't alert twice for the same listing and filter, e.g. after a filter reload
+        if self.seen_alerts.seen(('alerted', listing, filter_word)):
+            counts['alert.duplicate'] += 1
+            logger.debug("Alert for '%s' already sent for: %s", filter_word, embed.title)
+            return
+
+        self._alert(message, record, match)
+
+    def _deduplicate(
+        self,
+        message: discord.Message,
+        embed: discord.Embed
+    ) -> Optional[Tuple[EmbedRecord, Tuple[str, str], Tuple[FilterScope, ...]]]:
+        """
+        Extracts an embed's record and drops listings that were already inspected
+        against the same filters.
+
+        :param message: The message containing the embed.
+        :param embed: The Moneypenny embed.
+        :return: The record, listing fingerprint and applicable scopes, or `None` for a duplicate.
+        """
+        # Extract the title, description and named fields once; every filter reads this record
+        record = extract_record(embed)
+        if self.capture is not None:
+            self.capture.write(capture_entry(message, embed))
+
+        # Only the global filters and those scoped to this message's guild/channel apply
+        scopes = self.filters.scopes_for(message.guild.id if message.guild else 0, message.channel.id)
+
+        listing = listing_fingerprint(record.title, record.address)
+        if self.seen_alerts.seen(('inspected', listing, record.price, self.filters.version, scopes)):
+            self.stage_counts['match.duplicate'] += 1
+            logger.debug("Skipping duplicate listing: %s", embed.title)
+            return None
+        return record, listing, scopes
+
+    async def _match(self, record: EmbedRecord, scopes: Tuple[FilterScope, ...]) -> Optional[Match]:
+        """
+        Matches a record against the filters of the scopes.
+
+        :param record: The embed record.
+        :param scopes: The scopes whose filters apply.
+        :return: The best match, or `None`.
+        """
+        counts = self.stage_counts
+
+        # One pass over each field that filters target; picks the first filter in list order
+        match_started = time.perf_counter()
+        if self.match_pool.offloads(self.filters, scopes):
+            counts['match.offloaded'] += 1
+        match = await self.match_pool.best_match(self.filters, scopes, record)
+        MATCH_SECONDS.observe(time.perf_counter() - match_started)
+
+        if not match:
+            counts['match.no_match'] += 1
+        return match
+
+    def _alert(self, message: discord.Message, record: EmbedRecord, match: Match) -> None:
+        """
+        Stage 3: renders the alert for a match and queues it for the webhook.
+
+        :param message: The message containing the matched embed.
+        :param record: The fields extracted from the matched embed.
+        :param match: The filter match and the field it was found in.
+        """
+        filter_word = normalize_filter(match.filter)
+        payload = self.renderer.render(message, record, match, filter_word)
+
+        if self.send_webhook(payload, filter_word):
+            self.stage_counts['alert.queued'] += 1
+            logger.info("Filter '%s' matched and alert queued.", filter_word)
+        else:
+            self.stage_counts['alert.dropped'] += 1
+
+    def send_webhook(self, payload: Dict[str, Any], filter_word: str) -> bool:
+        """
+        Queues a rendered alert for every destination the filter is routed to.
+        The requests themselves are sent in the background by each destination's dispatcher.
+
+        :param payload: The webhook payload, shared by every destination.
+        :param filter_word: The normalized filter that matched, used to pick the destinations.
+        :return: True if at least one destination queued the alert, False if every queue was full.
+        """
+        return self.router.enqueue(filter_word, payload) > 0
 
 async def setup(bot: commands.Bot) -> None:
     """
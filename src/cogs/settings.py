@@ -0,0 +1,80 @@
+# Third-party imports
+from discord.ext import commands, tasks
+from discord.ext.commands import Context
+
+# Project-specific imports
+from src.configuration.config import ConfigError, config
+
+# Logger
+from src.configuration.debug import setup_logging
+logger = setup_logging()
+
+class Settings(commands.Cog):
+    def __init__(self, bot: commands.Bot) -> None:
+        """
+        Initializes the Settings cog, which reloads the configuration file when it changes.
+
+        :param bot: The Discord bot instance.
+        """
+        self.bot = bot
+        self.watch_config.change_interval(seconds=config.get('config_reload_interval', 5))
+
+    async def cog_load(self) -> None:
+        """
+        Starts watching the configuration file when the cog is loaded.
+        """
+        self.watch_config.start()
+
+    async def cog_unload(self) -> None:
+        """
+        Stops watching the configuration file when the cog is unloaded.
+        """
+        self.watch_config.cancel()
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Swaps in the configuration file's current contents if they changed and are valid.
+
+        :param force: Re-read the file even if it looks unchanged.
+        :return: True if the configuration is valid, False if it was rejected.
+        """
+        try:
+            changed = config.reload(force)
+        except ConfigError as e:
+            logger.error(f"Keeping the current configuration: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"Failed to apply the new configuration: {e}", exc_info=True)
+            return False
+
+        if changed:
+            self.watch_config.change_interval(seconds=config.get('config_reload_interval', 5))
+            logger.info(f"Reloaded configuration (version {config.snapshot.version}), changed: {', '.join(changed)}")
+        return True
+
+    @tasks.loop(seconds=5)
+    async def watch_config(self) -> None:
+        """
+        Periodically checks whether the configuration file was edited.
+        """
+        self.reload()
+
+    @commands.command(aliases=['configreload'])
+    async def reloadconfig(self, ctx: Context) -> None:
+        """
+        Re-reads the configuration file now.
+
+        :param ctx: The command context.
+        """
+        if self.reload(force=True):
+            await ctx.send(f"{ctx.author.mention}: Configuration reloaded (version `{config.snapshot.version}`).")
+        else:
+            await ctx.send(f"{ctx.author.mention}: The configuration file is invalid; keeping the current settings. See the log for details.")
+
+async def setup(bot: commands.Bot) -> None:
+    """
+    Asynchronous function to set up the Settings cog.
+
+    :param bot: The Discord bot instance.
+    """
+    await bot.add_cog(Settings(bot))
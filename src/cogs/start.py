@@ -4,6 +4,7 @@ from discord.ext import commands
 # Project-specific imports
 from src.configuration.config import config
 from src.utilities.console import clear_console, TerminalColors
+from src.utilities.startup import startup_timer
 
 # Logger
 from src.configuration.debug import setup_logging
@@ -28,11 +29,16 @@ class Start(commands.Cog):
         - Clears the console for a fresh log view.
         - Logs a message indicating the bot's connection to Discord.
         - Logs the command prefix set in the configuration.
+        - Logs how long startup took, the first time the bot becomes ready.
         """
         clear_console()
         logger.info(f"{TerminalColors.GREEN}{self.bot.user}{TerminalColors.RESET} connected to {TerminalColors.BLUE}Discord{TerminalColors.RESET}")
         logger.info(f"Prefix: {self.config['prefix']}")
 
+        # on_ready fires again after reconnects; only the first one ends startup
+        if not startup_timer.finished:
+            logger.info(startup_timer.finish('ready'))
+
 async def setup(bot: commands.Bot) -> None:
     """
     Asynchronous function to set up the Start cog.
@@ -1,21 +1,295 @@
 # System imports
 import json
-from typing import Dict, Any
+import os
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Mapping, Optional, Tuple
 
-CONFIG_FILE_PATH = 'src/configuration/config.json'
+# Relative paths are resolved against the repository root, not the working directory
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CONFIG_FILE_PATH = os.path.join(ROOT_DIR, 'src', 'configuration', 'config.json')
 
-def load_config() -> Dict[str, Any]:
+# Expected types of known settings; unknown settings are kept as they are
+NUMBER = (int, float)
+OPTIONAL_STRING = (str, type(None))
+
+SCHEMA: Dict[str, Tuple[type, ...]] = {
+    'token': (str,),
+    'webhook_url': (str,),
+    'prefix': (str,),
+    'log_level': (str,),
+    'log_format': (str,),
+    'log_async': (bool,),
+    'log_file': OPTIONAL_STRING,
+    'log_file_max_bytes': (int,),
+    'log_file_backups': (int,),
+    'channel_allowlist': (list,),
+    'guild_allowlist': (list,),
+    'config_reload_interval': NUMBER,
+    'filters_backend': (str,),
+    'filters_db_path': (str,),
+    'filters_reload_interval': NUMBER,
+    'filters_save_delay': NUMBER,
+    'filters_fsync': (bool,),
+    'webhook_queue_size': (int,),
+    'webhook_workers': (int,),
+    'webhook_max_retries': (int,),
+    'webhook_routes': (list,),
+    'filter_groups': (dict,),
+    'alert_template': (dict,),
+    'alert_batching': (bool,),
+    'alert_batch_window': NUMBER,
+    'alert_batch_max_wait': NUMBER,
+    'ingest_queue_size': (int,),
+    'ingest_workers': (int,),
+    'ingest_overflow': (str,),
+    'match_executor': (str,),
+    'match_workers': (int, type(None)),
+    'match_offload_threshold': (int,),
+    'capture_file': OPTIONAL_STRING,
+    'capture_max_bytes': (int,),
+    'capture_backups': (int,),
+    'cogs': (dict,),
+    'dedup_cache_size': (int,),
+    'dedup_ttl': NUMBER,
+    'slow_callback_threshold': (int, float, type(None)),
+    'profile_dir': (str,),
+    'metrics_host': (str,),
+    'metrics_port': (int, type(None))
+}
+
+# Settings that must be set, and settings limited to a few values
+REQUIRED = ('token', 'webhook_url', 'prefix')
+CHOICES: Dict[str, Tuple[str, ...]] = {
+    'log_level': ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'),
+    'log_format': ('color', 'plain', 'json'),
+    'filters_backend': ('json', 'sqlite'),
+    'ingest_overflow': ('drop_oldest', 'drop_nonmatching', 'block'),
+    'match_executor': ('inline', 'thread', 'process')
+}
+
+# Counts of workers and queue slots, and polling intervals in seconds, that must be at least 1 when set
+POSITIVE = (
+    'webhook_queue_size', 'webhook_workers', 'ingest_queue_size', 'match_workers', 'log_file_max_bytes', 'capture_max_bytes',
+    'config_reload_interval', 'filters_reload_interval'
+)
+
+# Lists of Discord IDs; each ID is a number, or a string of digits
+ID_LISTS = ('channel_allowlist', 'guild_allowlist')
+
+class ConfigError(ValueError):
+    """
+    Raised when the configuration file is missing, malformed or has invalid values.
+    """
+
+def _freeze(value: Any) -> Any:
+    """
+    :return: The value with lists turned into tuples and dicts into read-only mappings, recursively.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def validate_config(values: Mapping[str, Any]) -> None:
+    """
+    Checks the configuration against the known settings.
+
+    :param values: The parsed configuration.
+    :raises ConfigError: Listing every problem found.
+    """
+    problems: List[str] = []
+
+    for key in REQUIRED:
+        if not values.get(key):
+            problems.append(f"'{key}' is required")
+
+    for key, value in values.items():
+        expected = SCHEMA.get(key)
+        # bool is an int subclass, but true/false is never a valid number
+        if expected and (not isinstance(value, expected) or (isinstance(value, bool) and bool not in expected)):
+            names = ' or '.join('null' if kind is type(None) else kind.__name__ for kind in expected)
+            problems.append(f"'{key}' must be {names}")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and value < 0:
+            problems.append(f"'{key}' can't be negative")
+        elif key in POSITIVE and value is not None and value < 1:
+            problems.append(f"'{key}' must be at least 1")
+        elif key in CHOICES and value not in CHOICES[key]:
+            problems.append(f"'{key}' must be one of {', '.join(CHOICES[key])}")
+
+    for key in ID_LISTS:
+        ids = values.get(key)
+        if isinstance(ids, list) and not all(
+            (isinstance(item, int) and not isinstance(item, bool)) or (isinstance(item, str) and item.isdigit())
+            for item in ids
+        ):
+            problems.append(f"'{key}' must only contain IDs")
+
+    for name, enabled in (values.get('cogs') or {}).items():
+        if not isinstance(enabled, bool):
+            problems.append(f"'cogs' entry '{name}' must be true or false")
+
+    for index, route in enumerate(values.get('webhook_routes') or (), start=1):
+        if not isinstance(route, dict) or not isinstance(route.get('webhook_url'), str):
+            problems.append(f"'webhook_routes' entry {index} must be an object with a 'webhook_url'")
+
+    if problems:
+        raise ConfigError("Invalid configuration: " + '; '.join(problems))
+
+class Config(Mapping[str, Any]):
+    """
+    Immutable, validated snapshot of the configuration.
+    """
+
+    def __init__(self, values: Mapping[str, Any], version: int = 0) -> None:
+        """
+        :param values: The validated configuration.
+        :param version: Incremented with every reload.
+        """
+        self._values: Mapping[str, Any] = MappingProxyType({key: _freeze(value) for key, value in values.items()})
+        self.version = version
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._values.get(key, default)
+
+    def changed(self, other: 'Config') -> List[str]:
+        """
+        :param other: Another snapshot.
+        :return: The settings whose values differ between the snapshots.
+        """
+        return sorted(key for key in set(self) | set(other) if self.get(key) != other.get(key))
+
+def resolve_path(path: str) -> str:
+    """
+    :param path: A path from the configuration.
+    :return: The path, resolved against the repository root if it is relative.
+    """
+    return os.path.join(ROOT_DIR, path)
+
+def load_config(path: str = CONFIG_FILE_PATH) -> Dict[str, Any]:
     """
     Loads the bot configuration from a JSON file.
 
     This function reads the 'config.json' file located in the 'src/configuration/' directory
-    and returns its contents as a dictionary.
+    of the repository, wherever the bot is started from, and returns its contents as a dictionary.
 
+    :param path: The configuration file.
     :return: A dictionary containing the configuration settings.
     """
-    with open(CONFIG_FILE_PATH, 'r') as f:
+    with open(path, 'r') as f:
         config = json.load(f)
     return config
 
-# Load the configuration into a global variable
-config: Dict[str, Any] = load_config()
\ No newline at end of file
+# Called with the new snapshot after every reload
+Subscriber = Callable[[Config], None]
+
+class LiveConfig(Mapping[str, Any]):
+    """
+    The current configuration snapshot, swapped atomically when the file changes.
+
+    Modules keep a reference to this object rather than to a snapshot, so every read
+    sees the latest configuration. Code that needs several settings to be consistent
+    with each other should read them from a single `snapshot`. Settings that were
+    turned into other objects at startup (queues, caches, ...) are re-applied by
+    subscribers.
+    """
+
+    def __init__(self, path: str = CONFIG_FILE_PATH) -> None:
+        """
+        Loads and validates the configuration file.
+
+        :param path: The configuration file.
+        :raises ConfigError: If the file is invalid.
+        """
+        self.path = path
+        self._subscribers: List[Subscriber] = []
+        self._signature = self._file_signature()
+
+        values = load_config(path)
+        validate_config(values)
+        self._snapshot = Config(values)
+
+    @property
+    def snapshot(self) -> Config:
+        return self._snapshot
+
+    def __getitem__(self, key: str) -> Any:
+        return self._snapshot[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._snapshot)
+
+    def __len__(self) -> int:
+        return len(self._snapshot)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._snapshot.get(key, default)
+
+    def subscribe(self, subscriber: Subscriber) -> None:
+        """
+        :param subscriber: Called with the new snapshot after every reload.
+        """
+        self._subscribers.append(subscriber)
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        if subscriber in self._subscribers:
+            self._subscribers.remove(subscriber)
+
+    def _file_signature(self) -> Optional[Hashable]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def reload(self, force: bool = False) -> List[str]:
+        """
+        Re-reads the configuration file if it changed, and swaps in the new snapshot
+        if it is valid. An invalid file leaves the current snapshot in place and isn't
+        re-read until it changes again.
+
+        :param force: Re-read the file even if it looks unchanged.
+        :return: The settings that changed.
+        :raises ConfigError: If the file is invalid.
+        """
+        signature = self._file_signature()
+        if not force and signature == self._signature:
+            return []
+        self._signature = signature
+
+        try:
+            values = load_config(self.path)
+        except (OSError, ValueError) as e:
+            raise ConfigError(f"Could not read {self.path}: {e}") from e
+        validate_config(values)
+
+        previous = self._snapshot
+        snapshot = Config(values, previous.version + 1)
+        changed = snapshot.changed(previous)
+        if not changed:
+            return []
+
+        self._snapshot = snapshot
+
+        # Every subscriber gets the new snapshot, even if an earlier one fails
+        errors: List[Exception] = []
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber(snapshot)
+            except Exception as e:
+                errors.append(e)
+        if errors:
+            raise errors[0]
+        return changed
+
+# The live configuration, shared by every module
+config = LiveConfig()
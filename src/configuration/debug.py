@@ -1,26 +1,138 @@
+import atexit
 import logging
-from src.utilities.console import TerminalColors, ColoredFormatter
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import List, Optional
+
+from src.configuration.config import Config, config, resolve_path
+from src.utilities.console import TerminalColors, ColoredFormatter, PlainFormatter, JsonFormatter
+
+# Formatters selectable through the 'log_format' config option
+FORMATTERS = {
+    'color': ColoredFormatter,
+    'plain': PlainFormatter,
+    'json': JsonFormatter
+}
+
+# The configured logger, shared by every module that calls setup_logging()
+_logger: Optional[logging.Logger] = None
+_listener: Optional[QueueListener] = None
+
+class _PassthroughQueueHandler(QueueHandler):
+    """
+    Queues records as they are. The standard `QueueHandler.prepare` formats the message
+    on the logging thread and drops `exc_info`, which is exactly the work the listener
+    thread is there to do, and it leaves the sinks' formatters no traceback to render.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+def _build_sinks() -> List[logging.Handler]:
+    """
+    Creates the handlers that actually write log records, based on the configuration.
+
+    :return: The console handler, plus a rotating file handler if 'log_file' is set.
+    """
+    formatter_class = FORMATTERS.get(config.get('log_format', 'color'), ColoredFormatter)
+
+    # Create a console handler and set its formatter
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter_class('%(message)s'))
+    sinks: List[logging.Handler] = [console_handler]
+
+    # Optional rotating log file; never colored
+    log_file = config.get('log_file')
+    if log_file:
+        file_handler = RotatingFileHandler(
+            resolve_path(log_file),
+            maxBytes=config.get('log_file_max_bytes', 10 * 1024 * 1024),
+            backupCount=config.get('log_file_backups', 5),
+            encoding='utf-8'
+        )
+        file_formatter_class = JsonFormatter if formatter_class is JsonFormatter else PlainFormatter
+        file_handler.setFormatter(file_formatter_class('%(message)s'))
+        sinks.append(file_handler)
+
+    return sinks
 
 def setup_logging() -> logging.Logger:
     """
     Sets up the logging configuration for the bot with color formatting.
     Configures the logger to use a custom formatter for colored output in the console.
 
+    Unless 'log_async' is disabled in the configuration, the logger only puts records
+    on a queue; a background listener thread formats and writes them, so the event
+    loop never blocks on formatting or terminal/file I/O.
+
+    The logger is configured once; later calls return the same logger.
+
     :return: The configured logger for Discord bot logging.
     """
+    global _logger, _listener
+
+    if _logger is not None:
+        return _logger
+
     logger = logging.getLogger('discord')
-    logger.setLevel(logging.DEBUG)  # Adjust the logging level as needed
+    logger.setLevel(config.get('log_level', 'DEBUG'))  # Adjust the logging level as needed
 
     # Remove all existing handlers to avoid duplicate logs
     if logger.hasHandlers():
         logger.handlers.clear()
 
-    # Create a console handler and set its custom colored formatter
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(ColoredFormatter('%(message)s'))  # Define custom format if necessary
-    logger.addHandler(console_handler)
+    sinks = _build_sinks()
+
+    if config.get('log_async', True):
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        logger.addHandler(_PassthroughQueueHandler(log_queue))
+
+        _listener = QueueListener(log_queue, *sinks, respect_handler_level=True)
+        _listener.start()
+
+        # Flush queued records when the process exits
+        atexit.register(_listener.stop)
+    else:
+        for sink in sinks:
+            logger.addHandler(sink)
 
     # Prevent logging from propagating to the root logger
     logger.propagate = False
 
+    # Follow log level changes in the configuration file
+    config.subscribe(_apply_log_level)
+
+    _logger = logger
     return logger
+
+def setup_worker_logging() -> logging.Logger:
+    """
+    Reconfigures logging in a worker process, such as a match pool worker, to write
+    records straight to stderr. The log file and the listener thread belong to the
+    main process, so the worker doesn't keep its own copies of them.
+
+    :return: The configured logger.
+    """
+    global _listener
+
+    logger = setup_logging()
+
+    if _listener is not None:
+        atexit.unregister(_listener.stop)
+        _listener.stop()
+        for sink in _listener.handlers:
+            sink.close()
+        _listener = None
+
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+    stderr_handler = logging.StreamHandler()
+    stderr_handler.setFormatter(PlainFormatter('%(message)s'))
+    logger.addHandler(stderr_handler)
+    return logger
+
+def _apply_log_level(snapshot: Config) -> None:
+    if _logger is not None:
+        _logger.setLevel(snapshot.get('log_level', 'DEBUG'))
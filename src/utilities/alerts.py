@@ -0,0 +1,228 @@
+# System imports
+from datetime import datetime, timezone
+from string import Formatter
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+# Third-party imports
+import discord
+
+# Project-specific imports
+from src.cogs.data.fields import EmbedRecord
+from src.cogs.data.matcher import Match
+
+# Logger
+from src.configuration.debug import setup_logging
+logger = setup_logging()
+
+# Names that templates can use, e.g. "Filter **{filter}** found in message!"
+PLACEHOLDERS = frozenset((
+    'filter',      # The normalized filter that matched
+    'field',       # The field it matched in: title, description, address, ...
+    'field_name',  # The same, capitalized
+    'title',       # The embed title, or "No title"
+    'address',     # The embed's address field, or nothing
+    'matched',     # The text of the field the filter matched in
+    'other',       # The same, unless the field is the title or address (already shown)
+    'jump_url',    # Link to the original message
+    'guild',       # The server name, or nothing for DMs
+    'channel'      # The channel name
+))
+
+# The built-in alert format; 'alert_template' in the configuration overrides any part of it
+DEFAULT_TEMPLATE: Dict[str, Any] = {
+    'content': "@everyone",
+    'title': "Filter **{filter}** found in message!",
+    'description': "**Details**: Filter matched in the {field}.",
+    'color': 0x7F868C,
+    'username': None,
+    'avatar_url': None,
+    'fields': [
+        {'name': "**Original Message Title**", 'value': "{title}"},
+        {'name': "**Address**", 'value': "{address}"},
+        {'name': "**{field_name}**", 'value': "{other}"},
+        {'name': "**Jump to Message**", 'value': "[Click here to view the message]({jump_url})"}
+    ]
+}
+
+# Discord limits for the parts of an embed
+MAX_TITLE_LENGTH = 256
+MAX_DESCRIPTION_LENGTH = 4096
+MAX_FIELD_NAME_LENGTH = 256
+MAX_FIELD_VALUE_LENGTH = 1024
+
+# A compiled template: renders the placeholder values into a string
+Template = Callable[[Mapping[str, str]], str]
+
+def compile_template(text: str) -> Template:
+    """
+    Checks a template once, so rendering it is a single `format_map` call.
+
+    :param text: The template, using `str.format` placeholders.
+    :return: The compiled template.
+    :raises ValueError: If the template is malformed or uses unknown placeholders.
+    """
+    names = [name for _, name, _, _ in Formatter().parse(text) if name is not None]
+    unknown = [name for name in names if name not in PLACEHOLDERS]
+    if unknown:
+        raise ValueError(f"unknown placeholder(s) {', '.join('{' + name + '}' for name in unknown)}")
+
+    if not names:
+        # Constant text, e.g. the content line
+        constant = text.format_map({})
+        return lambda values: constant
+
+    # Surfaces format spec errors now rather than on the first alert
+    text.format_map(dict.fromkeys(PLACEHOLDERS, ''))
+    return text.format_map
+
+class BotIdentity:
+    """
+    The name and avatar alerts are posted with, read from the bot's user once instead
+    of on every alert.
+    """
+
+    def __init__(self, username: Optional[str] = None, avatar_url: Optional[str] = None) -> None:
+        self.username = username
+        self.avatar_url = avatar_url
+
+    @classmethod
+    def from_user(cls, user: Optional[discord.ClientUser]) -> 'BotIdentity':
+        """
+        :param user: The bot's user, or None before the bot is ready.
+        :return: The identity. Users without an avatar get their default avatar.
+        """
+        if user is None:
+            return cls()
+        return cls(user.display_name, user.display_avatar.url)
+
+class AlertRenderer:
+    """
+    Renders matches into webhook payloads from the configured alert template.
+
+    Templates are compiled when the configuration is applied, and the payload is built
+    as a plain dict, the same shape `discord.Embed.to_dict` would produce. The matched
+    text is highlighted from the match span, without searching the text again.
+    """
+
+    def __init__(self, template: Optional[Mapping[str, Any]] = None) -> None:
+        """
+        :param template: Overrides for parts of `DEFAULT_TEMPLATE`.
+        """
+        self.identity = BotIdentity()
+        self.configure(template)
+
+    def configure(self, template: Optional[Mapping[str, Any]]) -> None:
+        """
+        Compiles the alert template. Parts that fail to compile fall back to the default.
+
+        :param template: Overrides for parts of `DEFAULT_TEMPLATE`.
+        """
+        merged = dict(DEFAULT_TEMPLATE, **(template or {}))
+
+        def compile_part(key: str, text: Any, default: str) -> Template:
+            try:
+                return compile_template(str(text))
+            except ValueError as e:
+                logger.warning(f"Invalid alert template {key} {text!r} ({e}), using the default.")
+                return compile_template(default)
+
+        self.content = compile_part('content', merged['content'] or '', DEFAULT_TEMPLATE['content'])
+        self.title = compile_part('title', merged['title'], DEFAULT_TEMPLATE['title'])
+        self.description = compile_part('description', merged['description'], DEFAULT_TEMPLATE['description'])
+        self.color: int = merged['color'] if isinstance(merged['color'], int) else DEFAULT_TEMPLATE['color']
+
+        self.fields: List[Tuple[Template, Template, bool]] = []
+        for index, field in enumerate(merged['fields'] or ()):
+            if not isinstance(field, Mapping):
+                logger.warning(f"Invalid alert template field {index}: expected an object.")
+                continue
+            self.fields.append((
+                compile_part(f"field {index} name", field.get('name', ''), ''),
+                compile_part(f"field {index} value", field.get('value', ''), ''),
+                bool(field.get('inline', False))
+            ))
+
+        # Configured overrides for the bot's own name and avatar
+        self.username: Optional[str] = merged['username']
+        self.avatar_url: Optional[str] = merged['avatar_url']
+
+    def set_identity(self, user: Optional[discord.ClientUser]) -> None:
+        """
+        :param user: The bot's user, when the bot becomes ready or its profile changes.
+        """
+        self.identity = BotIdentity.from_user(user)
+
+    @staticmethod
+    def values(message: discord.Message, record: EmbedRecord, match: Match, filter_word: str) -> Dict[str, str]:
+        """
+        :return: The placeholder values for a match.
+        """
+        texts = record.texts
+        text = texts.get(match.field) or ''
+
+        # Bold the part of the matched field where the filter was found, preserving case
+        highlighted = f"{text[:match.start]}**{text[match.start:match.end]}**{text[match.end:]}"
+
+        title = highlighted if match.field == 'title' else texts.get('title')
+        address = highlighted if match.field == 'address' else texts.get('address')
+        guild = message.guild
+
+        return {
+            'filter': filter_word,
+            'field': match.field,
+            'field_name': match.field.capitalize(),
+            'title': title or "No title",
+            'address': address or '',
+            'matched': highlighted,
+            'other': highlighted if match.field not in ('title', 'address') else '',
+            'jump_url': message.jump_url,
+            'guild': guild.name if guild else '',
+            'channel': getattr(message.channel, 'name', None) or ''
+        }
+
+    def render(self, message: discord.Message, record: EmbedRecord, match: Match, filter_word: str) -> Dict[str, Any]:
+        """
+        Builds the webhook payload for a match. Fields that render empty are left out.
+
+        :param message: The message containing the matched embed.
+        :param record: The fields extracted from the matched embed.
+        :param match: The filter match and the field it was found in.
+        :param filter_word: The normalized filter that matched.
+        :return: The webhook payload.
+        """
+        values = self.values(message, record, match, filter_word)
+
+        fields = []
+        for name, value, inline in self.fields:
+            rendered = value(values)
+            if rendered:
+                fields.append({
+                    'name': name(values)[:MAX_FIELD_NAME_LENGTH],
+                    'value': rendered[:MAX_FIELD_VALUE_LENGTH],
+                    'inline': inline
+                })
+
+        payload: Dict[str, Any] = {
+            'embeds': [{
+                'type': 'rich',
+                'title': self.title(values)[:MAX_TITLE_LENGTH],
+                'description': self.description(values)[:MAX_DESCRIPTION_LENGTH],
+                'color': self.color,
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'fields': fields
+            }]
+        }
+
+        content = self.content(values)
+        if content:
+            payload['content'] = content
+
+        # Without a name or avatar, the webhook's own are used
+        username = self.username or self.identity.username
+        if username:
+            payload['username'] = username
+        avatar_url = self.avatar_url or self.identity.avatar_url
+        if avatar_url:
+            payload['avatar_url'] = avatar_url
+
+        return payload
@@ -0,0 +1,96 @@
+# System imports
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable
+
+class TTLCache:
+    """
+    Bounded set of recently seen keys with both LRU and time-based eviction.
+
+    A key expires `ttl` seconds after it was last seen; when the cache is full, the
+    least recently seen key is evicted. Because every hit refreshes a key's expiry,
+    keys are ordered by expiry and expired keys can be dropped from the front. Only a
+    lowered `ttl` breaks that order, so a key's own expiry is checked before it counts
+    as a hit.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 900.0) -> None:
+        """
+        :param maxsize: The maximum number of keys kept. A size of 0 disables the cache.
+        :param ttl: How long a key is remembered after it was last seen, in seconds.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self._entries: 'OrderedDict[Hashable, float]' = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expire(self, now: float) -> None:
+        """
+        Drops every key whose expiry has passed.
+
+        :param now: The current monotonic time.
+        """
+        entries = self._entries
+        while entries:
+            key, expires_at = next(iter(entries.items()))
+            if expires_at > now:
+                break
+            del entries[key]
+            self.expirations += 1
+
+    def seen(self, key: Hashable) -> bool:
+        """
+        Records a key and reports whether it was already in the cache.
+
+        :param key: The key to look up and remember.
+        :return: True if the key was seen within its TTL, False otherwise.
+        """
+        if self.maxsize <= 0:
+            self.misses += 1
+            return False
+
+        now = time.monotonic()
+        self._expire(now)
+
+        expires_at = self._entries.get(key)
+        if expires_at is not None and expires_at <= now:
+            # Left behind a later-expiring key after the TTL was lowered
+            del self._entries[key]
+            self.expirations += 1
+            expires_at = None
+
+        hit = expires_at is not None
+        if hit:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        else:
+            self.misses += 1
+            while len(self._entries) >= self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        self._entries[key] = now + self.ttl
+        return hit
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        :return: The cache's hit/miss/eviction counters and current size.
+        """
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations
+        }
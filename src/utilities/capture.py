@@ -0,0 +1,113 @@
+# System imports
+import json
+import logging
+import mmap
+import os
+import queue
+import time
+from logging.handlers import QueueListener, RotatingFileHandler
+from typing import Any, Dict, Iterator, List
+
+# Third-party imports
+import discord
+
+class CaptureFormatter(logging.Formatter):
+    """
+    Formats a captured entry as one compact JSON line.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.msg, ensure_ascii=False, separators=(',', ':'))
+
+def capture_entry(message: discord.Message, embed: discord.Embed) -> Dict[str, Any]:
+    """
+    Builds the captured form of an inspected embed: just what matching needs,
+    plus where and when it was posted.
+
+    :param message: The message containing the embed.
+    :param embed: The embed.
+    :return: The entry to capture.
+    """
+    return {
+        'time': time.time(),
+        'guild_id': message.guild.id if message.guild else 0,
+        'channel_id': message.channel.id,
+        'message_id': message.id,
+        'title': embed.title,
+        'description': embed.description,
+        'fields': [[field.name, field.value] for field in embed.fields]
+    }
+
+class CaptureWriter:
+    """
+    Appends captured embeds to a rotating JSON lines file.
+
+    Entries are handed to a background listener thread, the same way log records are,
+    so serializing and writing them never blocks the event loop.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 50 * 1024 * 1024, backups: int = 5) -> None:
+        """
+        Opens the capture file and starts the writer thread.
+
+        :param path: The capture file. Rotated files get a '.1', '.2', ... suffix.
+        :param max_bytes: The size at which the file is rotated.
+        :param backups: The number of rotated files to keep.
+        """
+        self.path = path
+
+        self._handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+        self._handler.setFormatter(CaptureFormatter())
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._listener = QueueListener(self._queue, self._handler)
+        self._listener.start()
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        """
+        Queues an entry to be written.
+
+        :param entry: The entry, see `capture_entry`.
+        """
+        self._queue.put_nowait(logging.makeLogRecord({'msg': entry}))
+
+    def close(self) -> None:
+        """
+        Writes the remaining entries and closes the file.
+        """
+        self._listener.stop()
+        self._handler.close()
+
+def capture_files(path: str) -> List[str]:
+    """
+    :param path: The configured capture file.
+    :return: The capture file and its rotated backups that exist, oldest first.
+    """
+    files: List[str] = []
+    index = 1
+    while os.path.exists(f"{path}.{index}"):
+        files.append(f"{path}.{index}")
+        index += 1
+
+    files.reverse()
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+def read_capture(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Streams the entries of a capture file through a memory map, so even large
+    captures are read without loading them into memory.
+
+    :param path: The capture file.
+    :return: An iterator over the captured entries. Truncated lines are skipped.
+    """
+    if os.path.getsize(path) == 0:
+        return
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for line in iter(mapped.readline, b''):
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
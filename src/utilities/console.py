@@ -1,29 +1,33 @@
 # System imports
-import os
+import json
 import logging
+import sys
 from datetime import datetime
+from typing import Optional
 
 def clear_console() -> None:
     """
     Clears the console screen.
 
-    Detects the operating system and executes the appropriate command 
-    to clear the console. It uses 'cls' for Windows and 'clear' for macOS and Linux.
+    Writes the ANSI "erase display" and "cursor home" sequences instead of running
+    'cls' or 'clear' in a subshell. Nothing is written when the output isn't a terminal,
+    so redirected logs don't collect escape codes.
     """
-    if os.name == 'nt':
-        os.system('cls')
-    else:
-        os.system('clear')
+    if sys.stdout.isatty():
+        sys.stdout.write("\033[2J\033[H")
+        sys.stdout.flush()
 
-def timestamp() -> str:
+def timestamp(when: Optional[float] = None) -> str:
     """
     Returns the current time formatted as a string in [HH:MM:SS AM/PM] format.
 
     Useful for timestamping logs or other time-sensitive operations.
     
-    :return: A string representing the current time in [HH:MM:SS AM/PM] format.
+    :param when: A POSIX timestamp to format instead of the current time.
+    :return: A string representing the time in [HH:MM:SS AM/PM] format.
     """
-    return datetime.now().strftime("%I:%M:%S %p")
+    moment = datetime.now() if when is None else datetime.fromtimestamp(when)
+    return moment.strftime("%I:%M:%S %p")
 
 class TerminalColors:
     """
@@ -65,8 +69,9 @@ class ColoredFormatter(logging.Formatter):
         log_color = self.LEVEL_COLORS.get(record.levelno, TerminalColors.RESET)
         reset_color = TerminalColors.RESET
 
-        # Format the time using the timestamp helper
-        formatted_time = timestamp()
+        # Format the time the record was created, which may be earlier than now
+        # when records are written by a background listener
+        formatted_time = timestamp(record.created)
 
         # Create the formatted log level, logger name, and message
         log_level = f"{log_color}{record.levelname:<8}{reset_color}"
@@ -79,4 +84,48 @@ class ColoredFormatter(logging.Formatter):
         if record.exc_info:
             formatted_message += f"\n{TerminalColors.RED}{self.formatException(record.exc_info)}{reset_color}"
 
-        return formatted_message
\ No newline at end of file
+        return formatted_message
+
+class PlainFormatter(logging.Formatter):
+    """
+    Logging formatter with the same layout as `ColoredFormatter` but without any ANSI
+    color codes, for log files and headless runs.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Formats the log record with a timestamp, level and logger name.
+
+        :param record: The log record to format.
+        :return: The formatted log line.
+        """
+        formatted_message = f"[{timestamp(record.created)}] {record.levelname:<8} [{record.name}] {record.getMessage()}"
+
+        if record.exc_info:
+            formatted_message += f"\n{self.formatException(record.exc_info)}"
+
+        return formatted_message
+
+class JsonFormatter(logging.Formatter):
+    """
+    Logging formatter that emits one JSON object per record, for log collectors.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Formats the log record as a single-line JSON object.
+
+        :param record: The log record to format.
+        :return: The JSON encoded record.
+        """
+        data = {
+            'time': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+
+        return json.dumps(data)
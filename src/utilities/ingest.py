@@ -0,0 +1,181 @@
+# System imports
+import asyncio
+from collections import Counter
+from typing import Any, Awaitable, Callable, List, Optional
+
+# Logger
+from src.configuration.debug import setup_logging
+logger = setup_logging()
+
+# What to do with a new item when the queue is full
+OVERFLOW_POLICIES = ('drop_oldest', 'drop_nonmatching', 'block')
+
+class IngestQueue:
+    """
+    Bounded queue of work items drained by a fixed number of worker tasks, so a burst
+    of incoming messages can't pile up an unbounded number of concurrent handlers.
+
+    When the queue is full, `overflow` decides what happens to a new item:
+
+    - 'drop_oldest' discards the item that has waited longest, keeping the freshest ones.
+    - 'drop_nonmatching' runs the `triage` check on the new item: items that don't need
+      handling are dropped, the rest wait for room in the queue as with 'block'. Triage
+      returns the item to queue, so it can pass along work the handler would otherwise
+      repeat, such as the match it found.
+    - 'block' makes the producer wait for room in the queue.
+
+    With zero workers there is no queue and every item is handled by the producer.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable[None]],
+        max_queue: int = 1000,
+        workers: int = 2,
+        overflow: str = 'drop_oldest',
+        triage: Optional[Callable[[Any], Awaitable[Optional[Any]]]] = None
+    ) -> None:
+        """
+        Initializes the queue. No workers run until `start` is called.
+
+        :param handler: Handles a single item.
+        :param max_queue: The maximum number of items waiting to be handled.
+        :param workers: The number of worker tasks, or 0 to handle items inline.
+        :param overflow: 'drop_oldest', 'drop_nonmatching' or 'block'.
+        :param triage: Returns the item to queue in place of one that needs handling, or
+            `None` for one that doesn't; required for 'drop_nonmatching'.
+        """
+        self.handler = handler
+        self.triage = triage
+        self.workers = 0
+        self.overflow = 'drop_oldest'
+
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_queue))
+        self.dropped: Counter = Counter()
+        self._tasks: List[asyncio.Task] = []
+        self._started = False
+
+        # Workers that should exit after their current item, when the worker count is lowered
+        self._retiring = 0
+
+        self.configure(workers, overflow)
+
+    def configure(self, workers: int, overflow: str) -> None:
+        """
+        Changes the number of workers and the overflow policy. Running workers are
+        added or retired accordingly; retiring workers finish their current item first.
+
+        :param workers: The number of worker tasks, or 0 to handle items inline.
+        :param overflow: 'drop_oldest', 'drop_nonmatching' or 'block'.
+        """
+        if overflow not in OVERFLOW_POLICIES or (overflow == 'drop_nonmatching' and self.triage is None):
+            logger.warning(f"Unsupported ingest overflow policy '{overflow}', dropping the oldest items instead.")
+            overflow = 'drop_oldest'
+
+        self.overflow = overflow
+        self.workers = max(0, workers)
+
+        if self._started:
+            self._resize()
+
+    def _resize(self) -> None:
+        """
+        Starts or retires workers until `workers` are running.
+        """
+        running = len(self._tasks) - self._retiring
+        if running < self.workers:
+            # Cancel pending retirements first, then start new workers for the rest
+            revived = min(self._retiring, self.workers - running)
+            self._retiring -= revived
+            running += revived
+            self._tasks.extend(asyncio.create_task(self._worker()) for _ in range(self.workers - running))
+        elif running > self.workers:
+            self._retiring += running - self.workers
+
+    def start(self) -> None:
+        """
+        Starts the worker tasks.
+        """
+        if not self._started:
+            self._started = True
+            self._retiring = 0
+            self._resize()
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """
+        Gives queued items a chance to be handled, then stops the workers.
+
+        :param timeout: How long to wait for the queue to drain, in seconds.
+        """
+        if not self._started:
+            return
+        self._started = False
+
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping {self.queue.qsize()} unhandled message(s) on shutdown.")
+
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def put(self, item: Any) -> bool:
+        """
+        Queues an item, applying the overflow policy if the queue is full.
+
+        :param item: The item to handle.
+        :return: True if the item was queued or handled, False if it was dropped.
+        """
+        if not self._tasks:
+            await self.handler(item)
+            return True
+
+        if self.overflow == 'block':
+            await self.queue.put(item)
+            return True
+
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if self.overflow == 'drop_nonmatching':
+            triaged = await self.triage(item)
+            if triaged is None:
+                self.dropped['nonmatching'] += 1
+                return False
+            # Handled by a worker like any other item, so the queue bound and worker count still hold
+            await self.queue.put(triaged)
+            return True
+
+        # drop_oldest: make room by discarding the item that has waited longest
+        try:
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.dropped['oldest'] += 1
+        except asyncio.QueueEmpty:
+            pass
+        self.queue.put_nowait(item)
+        return True
+
+    async def _worker(self) -> None:
+        """
+        Handles queued items until cancelled or retired.
+        """
+        while True:
+            item = await self.queue.get()
+            try:
+                await self.handler(item)
+            except Exception as e:
+                logger.error(f"Failed to handle queued message: {e}", exc_info=True)
+            finally:
+                self.queue.task_done()
+
+            # The last worker drains the queue before retiring
+            if self._retiring and (len(self._tasks) > 1 or self.queue.empty()):
+                self._retiring -= 1
+                self._tasks.remove(asyncio.current_task())
+                return
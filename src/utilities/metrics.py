@@ -0,0 +1,256 @@
+# System imports
+import math
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+# A metric sample: (name suffix, label values, value)
+Sample = Tuple[str, Tuple[str, ...], float]
+
+# Default histogram buckets, in seconds
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class Metric:
+    """
+    Base class for metrics exposed in the Prometheus text format.
+
+    Metrics are plain in-process objects: updating one is a dict operation, and
+    nothing is formatted until the registry is rendered.
+    """
+    type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        """
+        :param name: The metric name.
+        :param documentation: The help text.
+        :param labelnames: The names of the metric's labels, in order.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """
+        :return: The metric in the Prometheus text exposition format, one line per entry.
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+        for suffix, labels, value in self.samples():
+            names = self.labelnames + (('le',) if suffix == '_bucket' else ())
+            label_text = ','.join(f'{name}="{_escape(str(label))}"' for name, label in zip(names, labels))
+            label_text = f"{{{label_text}}}" if label_text else ''
+            lines.append(f"{self.name}{suffix}{label_text} {value}")
+        return lines
+
+class Counter(Metric):
+    """
+    A monotonically increasing value, optionally split by labels.
+    """
+    type = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """
+        :param labels: The label values, in the order of `labelnames`.
+        :param amount: The amount to add.
+        """
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def items(self) -> List[Tuple[Tuple[str, ...], float]]:
+        return list(self._values.items())
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, value in self._values.items():
+            yield '_total', labels, value
+
+class Gauge(Metric):
+    """
+    A value that can go up and down, or that is read from a callback when rendered.
+    """
+    type = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function: Optional[Callable[[], Mapping[Tuple[str, ...], float]]] = None
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set_function(self, function: Callable[[], Mapping[Tuple[str, ...], float]]) -> None:
+        """
+        Reads the gauge's values from a callback instead of stored values.
+
+        :param function: Returns a mapping of label values to gauge values.
+        """
+        self._function = function
+
+    def items(self) -> List[Tuple[Tuple[str, ...], float]]:
+        values = self._function() if self._function else self._values
+        return list(values.items())
+
+    def value(self, *labels: str) -> float:
+        return dict(self.items()).get(labels, 0.0)
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, value in self.items():
+            yield '', labels, value
+
+class CallbackCounter(Counter):
+    """
+    A counter whose values are maintained elsewhere (e.g. a plain `collections.Counter`
+    on the hot path) and only read when the metric is rendered.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        function: Callable[[], Mapping[Tuple[str, ...], float]]
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._function = function
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        raise TypeError(f"{self.name} is read from a callback and can't be incremented directly.")
+
+    def value(self, *labels: str) -> float:
+        return self._function().get(labels, 0.0)
+
+    def items(self) -> List[Tuple[Tuple[str, ...], float]]:
+        return list(self._function().items())
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, value in self._function().items():
+            yield '_total', labels, value
+
+class Histogram(Metric):
+    """
+    Distribution of observed values over fixed buckets.
+    """
+    type = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+        # Per label set: non-cumulative bucket counts (plus +Inf), sum and count
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        :param value: The observed value.
+        :param labels: The label values, in the order of `labelnames`.
+        """
+        counts = self._counts.get(labels)
+        if counts is None:
+            counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+            self._sums[labels] = 0.0
+
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[labels] += value
+
+    def count(self, *labels: str) -> int:
+        return sum(self._counts.get(labels, ()))
+
+    def mean(self, *labels: str) -> float:
+        count = self.count(*labels)
+        return self._sums.get(labels, 0.0) / count if count else 0.0
+
+    def quantile(self, fraction: float, *labels: str) -> float:
+        """
+        Estimates a quantile as the upper bound of the bucket it falls into.
+
+        :param fraction: The quantile as a fraction between 0 and 1.
+        :param labels: The label values.
+        :return: The estimated value, or 0 if nothing was observed.
+        """
+        counts = self._counts.get(labels)
+        if not counts:
+            return 0.0
+
+        target = fraction * sum(counts)
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), counts):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return math.inf
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, counts in self._counts.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield '_bucket', labels + ('+Inf' if bound == math.inf else str(bound),), cumulative
+            yield '_sum', labels, self._sums[labels]
+            yield '_count', labels, cumulative
+
+class Registry:
+    """
+    Collection of metrics rendered together.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """
+        Adds a metric, replacing any metric of the same name (e.g. after a cog reload).
+
+        :param metric: The metric to add.
+        :return: The metric.
+        """
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """
+        :return: Every registered metric in the Prometheus text exposition format.
+        """
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+# Registry shared by every cog
+registry = Registry()
+
+# Metrics updated outside of a single cog
+MATCH_SECONDS = registry.register(Histogram('moneypenny_match_seconds', 'Time spent matching one embed against the filters.'))
+FILTER_MATCHES = registry.register(Counter('moneypenny_filter_matches', 'Embed matches per filter.', ['filter']))
+FILTER_RELOADS = registry.register(Counter('moneypenny_filter_reloads', 'Filter list reloads.', ['source']))
+WEBHOOK_SECONDS = registry.register(Histogram('moneypenny_webhook_request_seconds', 'Webhook request latency.'))
+WEBHOOK_RESPONSES = registry.register(Counter('moneypenny_webhook_responses', 'Webhook responses by HTTP status.', ['status']))
+SLOW_CALLBACKS = registry.register(Counter('moneypenny_slow_callbacks', 'Event loop callbacks that ran longer than the slow callback threshold.'))
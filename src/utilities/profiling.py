@@ -0,0 +1,197 @@
+# System imports
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, List, NamedTuple, Optional
+
+# Project-specific imports
+from src.configuration.config import Config, config, resolve_path
+from src.utilities.metrics import SLOW_CALLBACKS
+
+# Logger
+from src.configuration.debug import setup_logging
+logger = setup_logging()
+
+class SlowCallback(NamedTuple):
+    time: float
+    seconds: float
+    callback: str
+
+def describe_handle(handle: asyncio.Handle) -> str:
+    """
+    :param handle: A scheduled event loop callback.
+    :return: What the callback runs: the coroutine of a task step, or the callback itself.
+    """
+    callback = getattr(handle, '_callback', None)
+    task = getattr(callback, '__self__', None)
+    if isinstance(task, asyncio.Task):
+        coroutine = task.get_coro()
+        name = getattr(coroutine, '__qualname__', None) or repr(coroutine)
+        return f"task {task.get_name()} running {name}"
+    return getattr(callback, '__qualname__', None) or repr(handle)
+
+class SlowCallbackDetector:
+    """
+    Logs event loop callbacks that block the loop for longer than a threshold.
+
+    asyncio's debug mode does the same through `slow_callback_duration`, but also adds
+    checks to every call that are too expensive to leave on in production. This times
+    `asyncio.Handle._run` instead, which every callback and task step of the standard
+    event loop goes through, at the cost of two clock reads per callback.
+
+    `Handle._run` is a private CPython API, and patching it affects every loop in the
+    process, so the wrapper only times handles of the loop it was installed from. Loops
+    that don't derive from `asyncio.BaseEventLoop`, such as uvloop's, run callbacks
+    without it; the detector isn't installed there and says so in the log.
+    """
+
+    def __init__(self, history: int = 50) -> None:
+        """
+        :param history: The number of recent slow callbacks kept for reports.
+        """
+        self.threshold = 0.0
+        self.recent: Deque[SlowCallback] = deque(maxlen=history)
+        self._original_run: Optional[Any] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def installed(self) -> bool:
+        return self._original_run is not None
+
+    def configure(self, threshold: Optional[float]) -> None:
+        """
+        Sets the threshold, installing or removing the detector as needed. It is
+        installed for the running event loop, so it must be called from that loop.
+
+        :param threshold: The longest a callback may run, in seconds; 0 or None turns detection off.
+        """
+        self.threshold = threshold or 0.0
+        if self.threshold > 0 and not self.installed:
+            self._install()
+        elif self.threshold <= 0 and self.installed:
+            self._uninstall()
+
+    def _install(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.warning("Slow callback detection can only be turned on from the event loop.")
+            return
+
+        if not isinstance(loop, asyncio.BaseEventLoop):
+            logger.warning(f"Slow callback detection isn't supported on {type(loop).__name__} event loops.")
+            return
+
+        original_run = self._original_run = asyncio.Handle._run
+        self._loop = loop
+        detector = self
+
+        def _run(handle: asyncio.Handle) -> None:
+            if handle._loop is not loop:
+                return original_run(handle)
+            started = time.perf_counter()
+            original_run(handle)
+            elapsed = time.perf_counter() - started
+            if elapsed > detector.threshold > 0:
+                detector._report(handle, elapsed)
+
+        asyncio.Handle._run = _run
+
+    def _uninstall(self) -> None:
+        asyncio.Handle._run = self._original_run
+        self._original_run = None
+        self._loop = None
+
+    def _report(self, handle: asyncio.Handle, elapsed: float) -> None:
+        callback = describe_handle(handle)
+        self.recent.append(SlowCallback(time.time(), elapsed, callback))
+        SLOW_CALLBACKS.inc()
+        logger.warning("Event loop blocked for %.0f ms by %s", elapsed * 1000, callback)
+
+    def worst(self) -> Optional[SlowCallback]:
+        """
+        :return: The slowest of the recent slow callbacks, if any.
+        """
+        return max(self.recent, key=lambda slow: slow.seconds, default=None)
+
+# The detector for the bot's event loop
+slow_callbacks = SlowCallbackDetector()
+
+def _apply_slow_callback_threshold(snapshot: Config) -> None:
+    slow_callbacks.configure(snapshot.get('slow_callback_threshold', 0.1))
+
+config.subscribe(_apply_slow_callback_threshold)
+
+class LoopProfiler:
+    """
+    Runs cProfile over the live event loop for a while and writes a report file.
+
+    cProfile traces the thread it is enabled in, which is the event loop's thread, so
+    every callback and coroutine step that runs while profiling is included.
+    """
+
+    def __init__(self) -> None:
+        self.running = False
+
+    async def profile(self, seconds: float, directory: str, top: int = 40) -> str:
+        """
+        Profiles the event loop.
+
+        :param seconds: How long to profile for.
+        :param directory: Where to write the report.
+        :param top: The number of functions listed per ordering.
+        :return: The path of the report.
+        :raises RuntimeError: If a profile is already running.
+        """
+        if self.running:
+            raise RuntimeError("A profile is already running.")
+        self.running = True
+
+        profiler = cProfile.Profile()
+        started = time.time()
+        try:
+            profiler.enable()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profiler.disable()
+        finally:
+            self.running = False
+
+        # Formatting the stats and writing them would block the loop, so it happens in a thread
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._write_report, profiler, started, seconds, directory, top)
+
+    @staticmethod
+    def _write_report(profiler: cProfile.Profile, started: float, seconds: float, directory: str, top: int) -> str:
+        report = io.StringIO()
+        report.write(f"Event loop profile started {datetime.fromtimestamp(started):%Y-%m-%d %H:%M:%S}, {seconds:g}s\n\n")
+
+        slow: List[SlowCallback] = [slow for slow in slow_callbacks.recent if slow.time >= started]
+        if slow:
+            report.write(f"Slow callbacks (over {slow_callbacks.threshold * 1000:.0f} ms):\n")
+            for entry in slow:
+                report.write(f"  {entry.seconds * 1000:8.1f} ms  {entry.callback}\n")
+            report.write("\n")
+
+        stats = pstats.Stats(profiler, stream=report)
+        for ordering in ('cumulative', 'tottime'):
+            report.write(f"Top {top} functions by {ordering} time:\n")
+            stats.sort_stats(ordering).print_stats(top)
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"profile-{datetime.fromtimestamp(started):%Y%m%d-%H%M%S}.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(report.getvalue())
+        return path
+
+def profile_directory() -> str:
+    """
+    :return: Where profile reports are written, from 'profile_dir' in the configuration.
+    """
+    return resolve_path(config.get('profile_dir', 'profiles'))
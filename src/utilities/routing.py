@@ -0,0 +1,178 @@
+# System imports
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+# Third-party imports
+import aiohttp
+
+# Project-specific imports
+from src.cogs.data.syntax import normalize_filter
+from src.utilities.webhook import WebhookDispatcher
+
+# Logger
+from src.configuration.debug import setup_logging
+logger = setup_logging()
+
+# Route filter that matches every filter
+ALL_FILTERS = '*'
+
+class Route:
+    """
+    Sends the alerts of some filters to a webhook.
+    """
+
+    def __init__(self, name: str, url: str, filters: Iterable[str], exclusive: bool = False) -> None:
+        """
+        :param name: The name used in logs and metrics; webhook URLs are secret.
+        :param url: The webhook URL.
+        :param filters: The normalized filters routed here, or '*' for all.
+        :param exclusive: Whether alerts taking this route skip the default webhook.
+        """
+        self.name = name
+        self.url = url
+        self.filters = frozenset(filters)
+        self.exclusive = exclusive
+
+    def matches(self, filter_word: str) -> bool:
+        return ALL_FILTERS in self.filters or filter_word in self.filters
+
+def parse_routes(routes: Iterable[Mapping[str, Any]], groups: Mapping[str, Iterable[str]]) -> List[Route]:
+    """
+    Builds routes from the 'webhook_routes' setting, expanding the filter groups they reference.
+
+    :param routes: Objects with a 'webhook_url', and 'filters' and/or 'groups' lists.
+    :param groups: The 'filter_groups' setting: group names mapped to lists of filters.
+    :return: The routes, in configuration order.
+    """
+    parsed: List[Route] = []
+    for index, route in enumerate(routes, start=1):
+        filters: Set[str] = {normalize_filter(filter_word) for filter_word in route.get('filters', ())}
+        for group in route.get('groups', ()):
+            if group not in groups:
+                logger.warning(f"Route {route.get('name', index)} references unknown filter group '{group}'.")
+            filters.update(normalize_filter(filter_word) for filter_word in groups.get(group, ()))
+
+        parsed.append(Route(
+            route.get('name') or f"route{index}",
+            route['webhook_url'],
+            filters,
+            exclusive=route.get('exclusive', False)
+        ))
+    return parsed
+
+class AlertRouter:
+    """
+    Fans alerts out to the webhooks their filter is routed to.
+
+    Every destination URL gets its own `WebhookDispatcher`, with its own queue and
+    rate-limit state, so a slow or rate-limited channel doesn't hold up the others.
+    The payload is rendered once by the caller and the same object is queued for every
+    destination. Alerts go to the default webhook unless every route they take is exclusive.
+    """
+
+    def __init__(self, default_url: str, dispatcher_factory: Callable[[str], WebhookDispatcher]) -> None:
+        """
+        :param default_url: The webhook receiving alerts that aren't exclusively routed elsewhere.
+        :param dispatcher_factory: Creates the dispatcher for a webhook URL.
+        """
+        self.dispatcher_factory = dispatcher_factory
+        self.default_url = default_url
+        self.routes: List[Route] = []
+
+        # Dispatchers by URL, and the name each destination is reported as
+        self.dispatchers: Dict[str, WebhookDispatcher] = {}
+        self.names: Dict[str, str] = {}
+
+        # Destination URLs per filter, resolved on first use
+        self._destinations: Dict[str, Tuple[str, ...]] = {}
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._started = False
+
+        # Dispatchers being started or closed after a configuration change
+        self._background: Set[asyncio.Task] = set()
+
+        self.configure(default_url, [])
+
+    def configure(self, default_url: str, routes: List[Route]) -> None:
+        """
+        Replaces the routing table. Dispatchers are created for new destinations and
+        closed, after sending what they have queued, for removed ones.
+
+        :param default_url: The default webhook URL.
+        :param routes: The routes.
+        """
+        self.default_url = default_url
+        self.routes = routes
+        self._destinations = {}
+
+        names = {default_url: 'default'}
+        for route in routes:
+            names.setdefault(route.url, route.name)
+        self.names = names
+
+        for url in names:
+            if url not in self.dispatchers:
+                dispatcher = self.dispatchers[url] = self.dispatcher_factory(url)
+                if self._started:
+                    self._run_in_background(dispatcher.start(self._session))
+
+        for url in [url for url in self.dispatchers if url not in names]:
+            dispatcher = self.dispatchers.pop(url)
+            if self._started:
+                self._run_in_background(dispatcher.close())
+
+    def _run_in_background(self, coroutine: Awaitable[None]) -> None:
+        task = asyncio.ensure_future(coroutine)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def destinations(self, filter_word: str) -> Tuple[str, ...]:
+        """
+        :param filter_word: The normalized filter that matched.
+        :return: The webhook URLs the filter's alerts go to.
+        """
+        destinations = self._destinations.get(filter_word)
+        if destinations is None:
+            matched = [route for route in self.routes if route.matches(filter_word)]
+            urls = [route.url for route in matched]
+            if not matched or not all(route.exclusive for route in matched):
+                urls.insert(0, self.default_url)
+            destinations = self._destinations[filter_word] = tuple(dict.fromkeys(urls))
+        return destinations
+
+    def enqueue(self, filter_word: str, payload: Dict[str, Any]) -> int:
+        """
+        Queues a payload for every destination of the filter.
+
+        :param filter_word: The normalized filter that matched.
+        :param payload: The rendered webhook payload, shared by every destination.
+        :return: The number of destinations that accepted the payload.
+        """
+        dispatchers = self.dispatchers
+        return sum(dispatchers[url].enqueue(payload) for url in self.destinations(filter_word))
+
+    def queue_depths(self) -> Dict[str, int]:
+        """
+        :return: The number of queued payloads per destination name.
+        """
+        return {self.names.get(url, url): dispatcher.queue.qsize() for url, dispatcher in self.dispatchers.items()}
+
+    async def start(self, session: Optional[aiohttp.ClientSession] = None) -> None:
+        """
+        Starts every destination's dispatcher on the shared session.
+
+        :param session: The shared session; dispatchers create their own if omitted.
+        """
+        self._session = session
+        self._started = True
+        await asyncio.gather(*(dispatcher.start(session) for dispatcher in self.dispatchers.values()))
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """
+        Gives queued payloads a chance to go out, then stops every dispatcher.
+
+        :param timeout: How long each dispatcher may take to drain its queue, in seconds.
+        """
+        self._started = False
+        await asyncio.gather(*(dispatcher.close(timeout=timeout) for dispatcher in self.dispatchers.values()))
@@ -0,0 +1,53 @@
+# System imports
+import time
+from typing import Dict
+
+class StartupTimer:
+    """
+    Records how long each phase of startup takes, from when this module is first
+    imported until the bot is ready.
+
+    Each call to `mark` ends the current phase, so phases are consecutive and add up
+    to the total startup time.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.finished = False
+        self._last = self.started
+
+    def mark(self, phase: str) -> None:
+        """
+        Ends a phase.
+
+        :param phase: The name of the phase that just finished.
+        """
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def finish(self, phase: str) -> str:
+        """
+        Ends the last phase.
+
+        :param phase: The name of the last phase.
+        :return: The timing report.
+        """
+        self.mark(phase)
+        self.finished = True
+        return self.report()
+
+    @property
+    def total(self) -> float:
+        return self._last - self.started
+
+    def report(self) -> str:
+        """
+        :return: A one-line summary of the phases, e.g. "Started in 1.84s (config 4 ms, ...)".
+        """
+        phases = ', '.join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in self.phases.items())
+        return f"Started in {self.total:.2f}s ({phases})"
+
+# Started as early as possible; main.py imports this module first
+startup_timer = StartupTimer()
@@ -0,0 +1,285 @@
+# System imports
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Third-party imports
+import aiohttp
+
+# Project-specific imports
+from src.utilities.metrics import WEBHOOK_RESPONSES, WEBHOOK_SECONDS
+
+# Logger
+from src.configuration.debug import setup_logging
+logger = setup_logging()
+
+# Discord limits for a single webhook message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARACTERS = 6000
+
+def embed_length(embed: Dict[str, Any]) -> int:
+    """
+    Counts the characters of a serialized embed the way Discord does for its
+    6000-character per-message limit.
+
+    :param embed: The embed, as returned by `discord.Embed.to_dict`.
+    :return: The number of counted characters.
+    """
+    length = len(embed.get('title', '')) + len(embed.get('description', ''))
+    length += len(embed.get('footer', {}).get('text', ''))
+    length += len(embed.get('author', {}).get('name', ''))
+    for field in embed.get('fields', []):
+        length += len(field.get('name', '')) + len(field.get('value', ''))
+    return length
+
+class WebhookDispatcher:
+    """
+    Long-lived sender for a single Discord webhook.
+
+    Payloads are put on a bounded queue and posted by background workers over a
+    shared `aiohttp.ClientSession`, so connections are kept alive and reused between
+    alerts. Workers follow Discord's rate-limit headers: when a bucket is exhausted
+    or a 429 is returned, every worker waits until the bucket resets.
+
+    With batching enabled, payloads queued close together are coalesced into one
+    multi-embed message (up to Discord's 10 embeds / 6000 characters), trading a
+    short, bounded delay for fewer requests and mentions during bursts.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        max_queue: int = 1000,
+        workers: int = 1,
+        max_retries: int = 3,
+        batching: bool = False,
+        batch_window: float = 0.25,
+        batch_max_wait: float = 1.0
+    ) -> None:
+        """
+        Initializes the dispatcher. No connection is made until `start` is called.
+
+        :param url: The webhook URL to post to.
+        :param max_queue: The maximum number of payloads waiting to be sent.
+        :param workers: The number of background sender tasks.
+        :param max_retries: How many times a rate-limited payload is retried before it is dropped.
+        :param batching: Whether to coalesce payloads queued close together into one message.
+        :param batch_window: How long to wait for another payload before sending a batch, in seconds.
+        :param batch_max_wait: The longest a batch may be held back after its first payload, in seconds.
+        """
+        self.url = url
+        self.workers = max(1, workers)
+        self.max_retries = max_retries
+
+        self.batching = batching
+        self.batch_window = batch_window
+        self.batch_max_wait = batch_max_wait
+
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._owns_session = False
+        self._tasks: List[asyncio.Task] = []
+
+        # Monotonic time until which the webhook's rate-limit bucket is exhausted
+        self._blocked_until = 0.0
+
+    async def start(self, session: Optional[aiohttp.ClientSession] = None) -> None:
+        """
+        Starts the background sender tasks.
+
+        :param session: The shared session to send through. A private one is created if omitted.
+        """
+        if self._tasks:
+            return
+
+        if session is None or session.closed:
+            session = aiohttp.ClientSession()
+            self._owns_session = True
+        self._session = session
+
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """
+        Gives queued payloads a chance to go out, then stops the sender tasks.
+
+        :param timeout: How long to wait for the queue to drain, in seconds.
+        """
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Dropping {self.queue.qsize()} unsent webhook payload(s) on shutdown.")
+
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+
+        if self._owns_session and self._session:
+            await self._session.close()
+        self._session = None
+
+    def enqueue(self, payload: Dict[str, Any]) -> bool:
+        """
+        Queues a webhook payload without waiting for it to be sent.
+
+        :param payload: The JSON body of the webhook request.
+        :return: True if the payload was queued, False if the queue is full and it was dropped.
+        """
+        try:
+            self.queue.put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            logger.warning("Webhook queue is full; dropping alert.")
+            return False
+
+    async def _worker(self) -> None:
+        """
+        Sends queued payloads until cancelled, coalescing them first if batching is enabled.
+        """
+        # A payload taken off the queue that didn't fit into the previous batch
+        carry: Optional[Dict[str, Any]] = None
+
+        while True:
+            batch = [carry if carry is not None else await self.queue.get()]
+            carry = await self._collect(batch) if self.batching else None
+
+            try:
+                await self._send(self._merge(batch))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to send webhook: {e}", exc_info=True)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def _collect(self, batch: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Adds queued payloads to the batch until the batch window passes without a new
+        payload, the max wait is reached, or the message would exceed Discord's limits.
+
+        :param batch: The batch to extend; it already holds the first payload.
+        :return: A payload that was taken off the queue but didn't fit, if any.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_max_wait
+        embeds, characters = self._measure(batch[0])
+
+        while embeds < MAX_EMBEDS_PER_MESSAGE:
+            if self.queue.empty():
+                timeout = min(self.batch_window, deadline - loop.time())
+                if timeout <= 0:
+                    break
+                try:
+                    payload = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                payload = self.queue.get_nowait()
+
+            payload_embeds, payload_characters = self._measure(payload)
+            if (
+                not self._compatible(batch[0], payload)
+                or embeds + payload_embeds > MAX_EMBEDS_PER_MESSAGE
+                or characters + payload_characters > MAX_EMBED_CHARACTERS
+            ):
+                return payload
+
+            batch.append(payload)
+            embeds += payload_embeds
+            characters += payload_characters
+
+        return None
+
+    @staticmethod
+    def _measure(payload: Dict[str, Any]) -> Tuple[int, int]:
+        """
+        :param payload: A webhook payload.
+        :return: The number of embeds in the payload and their total character count.
+        """
+        embeds = payload.get('embeds', [])
+        return len(embeds), sum(embed_length(embed) for embed in embeds)
+
+    @staticmethod
+    def _compatible(first: Dict[str, Any], other: Dict[str, Any]) -> bool:
+        """
+        Payloads can only share a message if everything but their embeds is identical.
+        """
+        return all(first.get(key) == other.get(key) for key in ('content', 'username', 'avatar_url'))
+
+    @staticmethod
+    def _merge(batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Combines compatible payloads into a single multi-embed payload.
+
+        :param batch: The payloads to combine.
+        :return: The combined payload.
+        """
+        if len(batch) == 1:
+            return batch[0]
+
+        merged = dict(batch[0])
+        merged['embeds'] = [embed for payload in batch for embed in payload.get('embeds', [])]
+        return merged
+
+    async def _wait_for_bucket(self) -> None:
+        delay = self._blocked_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _send(self, payload: Dict[str, Any]) -> None:
+        """
+        Posts a payload, retrying when Discord rate-limits the request.
+
+        :param payload: The JSON body of the webhook request.
+        """
+        for _ in range(self.max_retries + 1):
+            await self._wait_for_bucket()
+
+            started = time.perf_counter()
+            async with self._session.post(self.url, json=payload) as response:
+                WEBHOOK_SECONDS.observe(time.perf_counter() - started)
+                WEBHOOK_RESPONSES.inc(str(response.status))
+                self._update_bucket(response)
+
+                if response.status == 429:
+                    retry_after = await self._retry_after(response)
+                    self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+                    logger.warning(f"Webhook rate limited; retrying in {retry_after:.2f}s.")
+                    continue
+
+                if response.status >= 400:
+                    body = await response.text()
+                    logger.error(f"Webhook request failed with status {response.status}: {body}")
+                return
+
+        logger.error(f"Webhook payload dropped after {self.max_retries} rate-limited retries.")
+
+    def _update_bucket(self, response: aiohttp.ClientResponse) -> None:
+        """
+        Records when the rate-limit bucket resets if the response says it is exhausted.
+
+        :param response: The webhook response.
+        """
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset_after = response.headers.get('X-RateLimit-Reset-After')
+
+        if remaining == '0' and reset_after:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + float(reset_after))
+
+    @staticmethod
+    async def _retry_after(response: aiohttp.ClientResponse) -> float:
+        """
+        Reads how long to back off from a 429 response.
+
+        :param response: The rate-limited response.
+        :return: The delay in seconds.
+        """
+        try:
+            data = await response.json()
+            return float(data['retry_after'])
+        except Exception:
+            return float(response.headers.get('Retry-After', 1.0))